@@ -16,15 +16,10 @@ WIDTH = ENLARGE*len(image[0])
 # open a window of HEIGHTxWIDTH pixels (1-pixel sized tiles, no grid)
 g = screen.Screen((HEIGHT, WIDTH), 1, grid=False)
 
-# draw the enlarged image
-for y in range(HEIGHT):
-    for x in range(WIDTH):
-        l, c = y//ENLARGE, x//ENLARGE
-        if image[l][c] == 1:
-            g.draw_tile((y, x), "green", refresh=False)
-        elif image[l][c] == 2:
-            g.draw_tile((y, x), "lightgreen", refresh=False)
-g.refresh()
+# draw the enlarged image, all at once (0 = None = leave the background)
+enlarged = [[image[y//ENLARGE][x//ENLARGE] for x in range(WIDTH)]
+            for y in range(HEIGHT)]
+g.blit(enlarged, palette=[None, "green", "lightgreen"])
 
 # wait for the user to close the window
 while g.wait_event()[0] != "END":
@@ -7,6 +7,9 @@ This module provides four elementary functions to:
 - refresh the window (at any step of your program)
 - wait for the user to close the window
 
+and a function computing the colors of all pixels in parallel, using all the
+processors of the computer (`plot_parallel`).
+
 All these functions return nothing (None).
 A python exception (`AssertionError`, `InterruptedError` or `ValueError`) will
 be raised if any precondition of those functions is not met, and an explicit
@@ -37,7 +40,11 @@ Copyright 2018-2021, Vincent Loechner.
 Distributed under the MIT license (see LICENSE)
 https://github.com/vincentloechner/pytkdraw.git
 """
+import multiprocessing
+import time
+
 import tkdraw.screen as tkd
+from tkdraw import raster
 
 
 # window (global): main window of this simplified version
@@ -61,7 +68,8 @@ def open_win(height, width, zoom=1):
     # easier to use.
     global _WINDOW
     assert not _WINDOW, "ERROR: function open() was called twice!"
-    _WINDOW = tkd.Screen((height, width), zoom, grid=False)
+    # framebuffer: plotted pixels are stored in a single image
+    _WINDOW = tkd.Screen((height, width), zoom, grid=False, framebuffer=True)
 
 
 def plot(line, column, color="black"):
@@ -90,6 +98,106 @@ colors/>.
     _WINDOW.draw_tile((line, column), color=color, refresh=False)
 
 
+def plot_parallel(function, by_line=False, processes=None):
+    """Plot all pixels of the window, computing their colors in parallel.
+
+    The colors are computed by several processes (one per processor by
+    default), and each line is displayed as soon as it is computed. The window
+    can still be used meanwhile (moved, closed).
+
+    Usage notice: the function is called in other processes, it must be
+    defined at the top level of your program (not inside another function).
+    Depending on your system, your program may also need to be protected by
+    an `if __name__ == "__main__":` test.
+
+    Example:
+        ```py
+        def color(line, column):
+            return (line % 256, column % 256, 0)
+
+        if __name__ == "__main__":
+            graph.open_win(400, 600)
+            graph.plot_parallel(color)
+            graph.wait()
+        ```
+
+    Args:
+        function (function): function(line, column) returning the color of
+            a pixel, as a (red, green, blue) tuple of integers between 0 and
+            255 or a color string (such as "#FF0000"); or if by_line is True,
+            function(line) returning the list of colors of a whole line.
+        by_line (bool, optional): function computes whole lines (default:
+            False)
+        processes (int, optional): number of processes (default: number of
+            processors)
+
+    Raises:
+        AssertionError: if the window was not opened
+        InterruptedError: if the window was closed by the user
+    """
+    # pylint: disable=import-outside-toplevel
+    # only available since python 3.8.
+    from multiprocessing import shared_memory
+
+    assert _WINDOW, "ERROR: trying to plot in a non-existing window!"
+    height, width = _WINDOW.size
+    # the RGB pixels, written by the processes
+    shm = shared_memory.SharedMemory(create=True, size=3*height*width)
+    try:
+        with multiprocessing.Pool(processes, _init_worker,
+                                  (shm.name, width, function, by_line)) \
+                as pool:
+            lines = pool.imap_unordered(_compute_line, range(height))
+            last = time.perf_counter()
+            for _ in range(height):
+                while True:
+                    try:
+                        line = lines.next(timeout=0.05)
+                        break
+                    except multiprocessing.TimeoutError:
+                        # keep the window alive
+                        _WINDOW.refresh()
+                rgb = shm.buf[3*width*line:3*width*(line+1)].hex()
+                _WINDOW.blit([["#"+rgb[k:k+6] for k in range(0, 6*width, 6)]],
+                             origin=(line, 0), refresh=False)
+                if time.perf_counter()-last > 0.05:
+                    last = time.perf_counter()
+                    _WINDOW.refresh()
+    finally:
+        shm.close()
+        shm.unlink()
+    _WINDOW.refresh()
+
+
+# worker process of plot_parallel: shared memory, width, function, by_line
+_WORKER = None
+
+
+def _init_worker(name, width, function, by_line):
+    """Internal: initialize a worker process of plot_parallel."""
+    # pylint: disable=global-statement,import-outside-toplevel
+    global _WORKER
+    from multiprocessing import shared_memory
+    _WORKER = (shared_memory.SharedMemory(name=name), width, function, by_line)
+
+
+def _compute_line(line):
+    """Internal: compute a line of pixels in a worker process of plot_parallel.
+
+    Returns:
+        int: the line, its pixels were written in the shared memory
+    """
+    shm, width, function, by_line = _WORKER
+    if by_line:
+        colors = function(line)
+    else:
+        colors = [function(line, j) for j in range(width)]
+    shm.buf[3*width*line:3*width*(line+1)] = b"".join(
+        bytes(raster.parse_color(c) if isinstance(c, str) else c)
+        for c in colors)
+    return line
+
+
 def refresh():
     """Refresh the window.
 
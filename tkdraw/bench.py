@@ -0,0 +1,405 @@
+"""Benchmarks of the tkdraw modules.
+
+Run them using `python3 -m tkdraw.bench`. They are not interactive, but they
+need a display (Xvfb is fine: `xvfb-run python3 -m tkdraw.bench`), or the
+offscreen backend: `python3 -m tkdraw.bench --backend offscreen` (then the
+timings of the events are meaningless, there is no real waiting).
+
+The results can be saved in a JSON file, and compared to a previous run to
+detect performance regressions:
+```
+$ python3 -m tkdraw.bench --output baseline.json
+$ ... # modify tkdraw
+$ python3 -m tkdraw.bench --compare baseline.json
+```
+All measures are durations (the lower the better). A measure is flagged as a
+regression when it is slower than the baseline by more than a threshold (20%
+by default), and the exit status is then 1.
+
+Copyright 2018-2022, Vincent Loechner.
+Distributed under the MIT license (see LICENSE)
+https://github.com/vincentloechner/pytkdraw.git
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import tkdraw.screen as tkd
+
+
+def _summary(values):
+    """Internal: statistics of a list of durations (in seconds), in ms."""
+    return {
+        "mean_ms": 1000*statistics.mean(values),
+        "median_ms": 1000*statistics.median(values),
+        "max_ms": 1000*max(values),
+    }
+
+
+def _click(win, pos):
+    """Internal: simulate a click on a tile of the window."""
+    if hasattr(win, "push_event"):
+        # offscreen backend
+        win.push_event(("click", pos))
+    else:
+        win.event_generate("<Button-1>", when="tail",
+                           x=pos[1]*win.pixels+win.pixels//2+1,
+                           y=pos[0]*win.pixels+win.pixels//2+1)
+
+
+def bench_plot_fill(size=(400, 600), backend=None):
+    """Fill a whole pixel window, one pixel at a time.
+
+    The window is the one opened by `tkdraw.basic.open_win`, and the pixels
+    are plotted as `tkdraw.basic.plot` does.
+
+    Args:
+        size ([int, int], optional): size of the window (default: 400x600)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: time to plot all pixels, and time to display them (ms)
+    """
+    colors = ["black", "red", "white", "green"]
+    with tkd.Screen(size, 1, grid=False, framebuffer=True,
+                    backend=backend) as win:
+        start = time.perf_counter()
+        for i in range(size[0]):
+            for j in range(size[1]):
+                win.draw_tile((i, j), colors[(i+j)//15 % 4], refresh=False)
+        plotted = time.perf_counter()
+        win.refresh()
+        end = time.perf_counter()
+    return {"plot_ms": 1000*(plotted-start), "refresh_ms": 1000*(end-plotted)}
+
+
+def bench_draw_grid(size=(100, 100), moves=200, backend=None):
+    """Draw a large board with draw_grid, then redraw it after each move.
+
+    Args:
+        size ([int, int], optional): size of the board (default: 100x100)
+        moves (int, optional): number of redraws (default: 200)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: time of the first drawing, mean time of a redraw, and time to
+            erase the board (ms)
+    """
+    matrix = [[(i*j) % 3 or None for j in range(size[1])]
+              for i in range(size[0])]
+    with tkd.Screen(size, 8, backend=backend) as win:
+        start = time.perf_counter()
+        win.draw_grid(matrix)
+        first = time.perf_counter()
+        for k in range(moves):
+            i, j = k*7 % size[0], k*13 % size[1]
+            matrix[i][j] = None if matrix[i][j] else k % 10
+            win.draw_grid(matrix)
+        end = time.perf_counter()
+        win.erase()
+        erased = time.perf_counter()
+    return {"first_ms": 1000*(first-start),
+            "redraw_ms": 1000*(end-first)/moves,
+            "erase_ms": 1000*(erased-end)}
+
+
+def bench_move_pieces(pieces=500, frames=50, backend=None):
+    """Animate many pieces, moving all of them at each frame.
+
+    Args:
+        pieces (int, optional): number of pieces (default: 500)
+        frames (int, optional): number of frames (default: 50)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: mean time of a frame (ms)
+    """
+    with tkd.Screen((50, 50), 10, backend=backend) as win:
+        objs = [win.draw_piece((k//50, k % 50), k, refresh=False)
+                for k in range(pieces)]
+        win.refresh()
+        start = time.perf_counter()
+        for frame in range(frames):
+            for k, obj in enumerate(objs):
+                win.move_piece(obj, ((k//50+frame) % 50, k % 50),
+                               refresh=False)
+            win.refresh()
+        end = time.perf_counter()
+    return {"frame_ms": 1000*(end-start)/frames}
+
+
+def bench_piece_churn(count=5000, backend=None):
+    """Delete and draw pieces again, as captures and respawns in a game.
+
+    Args:
+        count (int, optional): number of replacements (default: 5000)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: mean time of a replacement (microseconds), without and with a
+            piece pool
+    """
+    result = {}
+    for pool in (0, 64):
+        with tkd.Screen((8, 8), 50, piece_pool=pool, backend=backend) as win:
+            objs = [win.draw_piece((k//8, k % 8), k, refresh=False)
+                    for k in range(64)]
+            win.refresh()
+            start = time.perf_counter()
+            for k in range(count):
+                win.rm(objs[k % 64], refresh=False)
+                objs[k % 64] = win.draw_piece(((k % 64)//8, k % 8), k+1,
+                                              refresh=False)
+                if k % 64 == 63:
+                    win.refresh()
+            end = time.perf_counter()
+        result[f"pool{pool}_us"] = 1e6*(end-start)/count
+    return result
+
+
+def bench_text_churn(count=2000, backend=None):
+    """Change a text many times, as a score or a status line.
+
+    Args:
+        count (int, optional): number of changes (default: 2000)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: mean time of a change (microseconds), by deleting the text and
+            drawing a new one, and using update_text
+    """
+    with tkd.Screen((8, 8), 50, backend=backend) as win:
+        obj = win.draw_text((20, 200), "score: 0")
+        start = time.perf_counter()
+        for k in range(count):
+            win.rm(obj, refresh=False)
+            obj = win.draw_text((20, 200), f"score: {k}")
+        replaced = time.perf_counter()
+        for k in range(count):
+            win.update_text(obj, f"score: {k}")
+        end = time.perf_counter()
+    return {"replace_us": 1e6*(replaced-start)/count,
+            "update_us": 1e6*(end-replaced)/count}
+
+
+def bench_click_latency(count=200, backend=None):
+    """Time between a click and the return of wait_event().
+
+    Args:
+        count (int, optional): number of clicks (default: 200)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: mean, median and max latency (ms)
+    """
+    with tkd.Screen((8, 8), 50, backend=backend) as win:
+        win.refresh()
+        latency = []
+        for k in range(count):
+            pos = (k % 8, k//8 % 8)
+            _click(win, pos)
+            start = time.perf_counter()
+            evt = win.wait_event()
+            latency.append(time.perf_counter()-start)
+            assert evt == ("click", pos), evt
+    return _summary(latency)
+
+
+def bench_delay_accuracy(delays=(1, 10, 50), count=20, backend=None):
+    """Accuracy of the expiry of wait_event(delay), with no event.
+
+    Args:
+        delays (list of int, optional): the tested delays (ms)
+        count (int, optional): number of waits per delay (default: 20)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: for each delay, mean, median and max lateness (ms)
+    """
+    result = {}
+    with tkd.Screen((8, 8), 50, backend=backend) as win:
+        win.refresh()
+        for delay in delays:
+            late = []
+            for _ in range(count):
+                if hasattr(win, "push_event"):
+                    # offscreen backend: let the time pass
+                    win.push_event(None)
+                start = time.perf_counter()
+                evt = win.wait_event(delay)
+                late.append(time.perf_counter()-start-delay/1000)
+                assert evt is None, evt
+            for key, value in _summary(late).items():
+                result[f"{delay}ms_{key}"] = value
+    return result
+
+
+def bench_colors(count=100000, backend=None):
+    """Cost of a draw_tile call with color strings and with color handles.
+
+    The same tiles (tile cache enabled) are recolored count times.
+
+    Args:
+        count (int, optional): number of draw_tile calls (default: 100000)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: the time per call (microseconds), using color names, RGB
+            strings and color handles
+    """
+    names = ["red", "green", "blue", "yellow", "cyan", "magenta"]
+    rgb = ["#ff0000", "#00ff00", "#0000ff", "#ffff00", "#00ffff", "#ff00ff"]
+    result = {}
+    with tkd.Screen((100, 100), 4, grid=False, framebuffer=False,
+                    tile_cache=True, backend=backend) as win:
+        handles = [win.color(c) for c in names]
+        for kind, colors in [("names", names), ("rgb", rgb),
+                             ("handles", handles)]:
+            start = time.perf_counter()
+            for k in range(count):
+                win.draw_tile((k//100 % 100, k % 100), colors[k % 6],
+                              refresh=False)
+            win.refresh()
+            result[kind+"_us"] = 1e6*(time.perf_counter()-start)/count
+    return result
+
+
+def bench_line_plot(count=20000, size=(400, 600), backend=None):
+    """Plot many short segments in a pixel window, with draw_lines.
+
+    Args:
+        count (int, optional): number of segments (default: 20000)
+        size ([int, int], optional): size of the window (default: 400x600)
+        backend (str, optional): backend of the window (default: None)
+
+    Returns:
+        dict: time to draw the segments, and time to display them (ms)
+    """
+    # a polyline going back and forth over the window
+    points = [((k*7) % size[0], (k*13) % size[1]) for k in range(count+1)]
+    with tkd.Screen(size, 1, grid=False, backend=backend) as win:
+        start = time.perf_counter()
+        win.draw_lines(points[:-1], points[1:], "blue", refresh=False)
+        drawn = time.perf_counter()
+        win.refresh()
+        end = time.perf_counter()
+    return {"draw_ms": 1000*(drawn-start), "refresh_ms": 1000*(end-drawn)}
+
+
+BENCHMARKS = {
+    "plot_fill": bench_plot_fill,
+    "draw_grid": bench_draw_grid,
+    "move_pieces": bench_move_pieces,
+    "piece_churn": bench_piece_churn,
+    "text_churn": bench_text_churn,
+    "click_latency": bench_click_latency,
+    "delay_accuracy": bench_delay_accuracy,
+    "colors": bench_colors,
+    "line_plot": bench_line_plot,
+}
+"""All benchmarks, by name."""
+
+
+def run(names=None, backend=None, repeat=3):
+    """Run some benchmarks, several times, keeping the best measures.
+
+    Args:
+        names (list of str, optional): the benchmarks to run (default: all,
+            see BENCHMARKS)
+        backend (str, optional): backend of the windows (default: None, see
+            `tkdraw.screen.Screen`)
+        repeat (int, optional): number of runs of each benchmark (default: 3)
+
+    Returns:
+        dict: the results, for each benchmark a dict of measures
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        for _ in range(repeat):
+            measures = BENCHMARKS[name](backend=backend)
+            best = results.setdefault(name, measures)
+            for key, value in measures.items():
+                best[key] = min(best[key], value)
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """Compare results to a baseline, return the regressions.
+
+    Args:
+        results (dict): the results, as returned by run()
+        baseline (dict): the baseline results
+        threshold (float, optional): tolerated slowdown (default: 0.2 = 20%)
+
+    Returns:
+        list of (str, str, float, float): the regressions (benchmark, measure,
+            baseline value, new value)
+    """
+    regressions = []
+    for name, measures in results.items():
+        for key, value in measures.items():
+            base = baseline.get(name, {}).get(key)
+            # negative or zero values can't be compared (delays offscreen)
+            if base is not None and base > 0 and value > base*(1+threshold):
+                regressions.append((name, key, base, value))
+    return regressions
+
+
+def main(argv=None):
+    """Command line interface, see `python3 -m tkdraw.bench --help`.
+
+    Returns:
+        int: the exit status, 1 if some regressions were found
+    """
+    parser = argparse.ArgumentParser(
+        prog="python3 -m tkdraw.bench",
+        description="Run the tkdraw benchmarks.")
+    parser.add_argument("names", nargs="*", metavar="BENCHMARK",
+                        help="benchmarks to run (default: all), among "
+                        + ", ".join(BENCHMARKS))
+    parser.add_argument("--backend", choices=["tk", "offscreen"],
+                        help="backend of the windows (default: "
+                        "$TKDRAW_BACKEND or tk)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of each benchmark, the best is kept "
+                        "(default: 3)")
+    parser.add_argument("--output", metavar="FILE",
+                        help="save the results in a JSON file")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="compare the results to a JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="tolerated slowdown when comparing "
+                        "(default: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name}")
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "results": run(args.names, args.backend, args.repeat),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as base:
+            baseline = json.load(base)
+        regressions = compare(report["results"], baseline["results"],
+                              args.threshold)
+        for name, key, base, value in regressions:
+            print(f"REGRESSION {name} {key}: {base:.4g} -> {value:.4g} "
+                  f"({100*(value/base-1):+.0f}%)", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Capture the frames of a tkdraw window, to make an animation.
+
+A window captures its content at each refresh after
+`Screen.start_capture(target)`. The frames are written as PPM images or raw
+RGB data, in a sequence of files, in a single file, or in a pipe such as the
+input of ffmpeg to encode a video:
+```
+ffmpeg = subprocess.Popen(["ffmpeg", "-f", "image2pipe", "-c:v", "ppm",
+                           "-framerate", "30", "-i", "-", "anim.mp4"],
+                          stdin=subprocess.PIPE)
+g.start_capture(ffmpeg.stdin)
+... # draw and refresh
+g.stop_capture()
+ffmpeg.stdin.close()
+ffmpeg.wait()
+```
+
+The frames are drawn (for a tk window) and written by a background thread,
+the window only takes a snapshot of its content at each captured refresh.
+
+Copyright 2018-2022, Vincent Loechner.
+Distributed under the MIT license (see LICENSE)
+https://github.com/vincentloechner/pytkdraw.git
+"""
+import queue
+import threading
+
+
+class Capture:
+    """Writes the frames of a window, see `Screen.start_capture`.
+
+    Args:
+        target (str or file): a file name, a file name pattern containing
+            "%", such as "frame%04d.ppm", to write each frame in its own file,
+            or a binary file object open for writing (a pipe for example)
+        every (int, optional): capture one refresh out of every (default: 1)
+        fmt (str, optional): "ppm" or "raw" (RGB bytes) (default: "ppm")
+        wait (bool, optional): if the writer thread is late, wait for it
+            (True), or drop the frame (False) (default: False)
+        queue_size (int, optional): number of frames waiting to be written
+            (default: 8)
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+    # it is reasonable here.
+    def __init__(self, target, every=1, fmt="ppm", wait=False, queue_size=8):
+        if fmt not in ("ppm", "raw"):
+            raise ValueError(f"unknown capture format \"{fmt}\"")
+        self.frames = 0
+        self.dropped = 0
+        self._every = every
+        self._count = 0
+        self._fmt = fmt
+        self._wait = wait
+        self._pattern = None
+        self._own = False
+        if isinstance(target, str) and "%" in target:
+            self._pattern = target
+            self._out = None
+        elif isinstance(target, str):
+            # pylint: disable=consider-using-with
+            # the file is closed by close().
+            self._out = open(target, "wb")
+            self._own = True
+        else:
+            self._out = target
+        self._error = None
+        self._queue = queue.Queue(queue_size)
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def refreshed(self, snapshot):
+        """Capture a frame, if it's time to, after a refresh of the window.
+
+        Args:
+            snapshot (function): returns a function drawing the frame (a
+                `tkdraw.raster.Raster`), called by the writer thread. It's
+                only called if the frame is captured, not dropped.
+        """
+        self._count += 1
+        if self._count % self._every:
+            return
+        if not self._wait and self._queue.full():
+            # dropped before taking the snapshot, which may cost much
+            self.dropped += 1
+            return
+        try:
+            self._queue.put(snapshot(), block=self._wait)
+        except queue.Full:
+            self.dropped += 1
+
+    def _writer(self):
+        """Internal: the writer thread, draws and writes the frames."""
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is not None:
+                # can't write anymore, just empty the queue
+                continue
+            try:
+                img = frame()
+                data = img.to_ppm() if self._fmt == "ppm" else bytes(img.data)
+                if self._pattern is not None:
+                    with open(self._pattern % self.frames, "wb") as out:
+                        out.write(data)
+                else:
+                    self._out.write(data)
+                self.frames += 1
+            except (OSError, ValueError) as exc:
+                self._error = exc
+
+    def close(self):
+        """Write the last frames and stop capturing.
+
+        Returns:
+            dict: the number of "frames" written, and of "dropped" frames
+
+        Raises:
+            OSError: if the frames could not be written
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self._own:
+            self._out.close()
+        elif self._out is not None:
+            self._out.flush()
+        if self._error is not None:
+            raise self._error
+        return {"frames": self.frames, "dropped": self.dropped}
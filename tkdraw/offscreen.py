@@ -0,0 +1,640 @@
+"""Offscreen (headless) backend of the tkdraw.screen module.
+
+The `OffscreenScreen` class has the same interface as `tkdraw.screen.Screen`,
+but it does not open any window: everything is drawn in an RGB image in
+memory, that can be saved as a PPM or PNG file. It does not need any display
+(X server), nor even tkinter's Tcl interpreter.
+
+The events (clicks, keys) are not produced by a user, they are taken from a
+script, a list of events given when opening the window or pushed later using
+`OffscreenScreen.push_event`. When the script is empty, the window is closed
+(`wait_event` returns `("END", None)`), as if a user closed it.
+
+Usage:
+    To run any program using tkdraw offscreen, set the TKDRAW_BACKEND
+    environment variable: `TKDRAW_BACKEND=offscreen python3 program.py`, or
+    create the window with `tkdraw.screen.Screen(..., backend="offscreen")`.
+
+Example:
+    ```
+    import tkdraw.screen
+    g = tkdraw.screen.Screen((8, 8), 10, backend="offscreen",
+                             events=[("click", (2, 3))])
+    g.draw_piece(g.wait_event()[1], color="red")
+    g.save("board.png")
+    g.close()
+    ```
+
+Copyright 2018-2022, Vincent Loechner.
+Distributed under the MIT license (see LICENSE)
+https://github.com/vincentloechner/pytkdraw.git
+"""
+import asyncio
+import collections
+import heapq
+import tkinter as tk
+import types
+import _tkinter
+
+import tkdraw.screen as tkd
+from tkdraw import raster
+
+
+class _Root:
+    """Internal: stands for the tk root window and its event loop.
+
+    Timers only expire when the script says so (a None event), the scripted
+    events are dispatched to the bindings of the window, and the window is
+    closed when the script is empty.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # it is reasonable here.
+    def __init__(self):
+        # the Tcl interpreter, for root.tk.dooneevent()
+        self.tk = self
+        self.script = collections.deque()
+        self.bindings = {}
+        self.protocols = {}
+        self.clock = 0
+        self._timers = []
+        self._idle = []
+        self._cancelled = set()
+        self._count = 0
+
+    def after(self, delay, func, *args):
+        """Schedule func(*args) after delay ms (simulated time)."""
+        self._count += 1
+        ident = f"after#{self._count}"
+        heapq.heappush(self._timers,
+                       (self.clock+delay, self._count, ident, func, args))
+        return ident
+
+    def after_idle(self, func, *args):
+        """Schedule func(*args) when there is nothing else to do."""
+        self._count += 1
+        ident = f"after#{self._count}"
+        self._idle.append((ident, func, args))
+        return ident
+
+    def after_cancel(self, ident):
+        """Cancel a timer scheduled by after() or after_idle()."""
+        self._cancelled.add(ident)
+
+    def protocol(self, name, func):
+        """Set a window manager handler (WM_DELETE_WINDOW)."""
+        self.protocols[name] = func
+
+    def destroy(self):
+        """Forget everything: the window is closed."""
+        self.script.clear()
+        self._timers.clear()
+        self._idle.clear()
+
+    def run_idle(self):
+        """Run the pending idle callbacks, return True if there were some."""
+        idle, self._idle = self._idle, []
+        for ident, func, args in idle:
+            if ident not in self._cancelled:
+                func(*args)
+        return bool(idle)
+
+    def dooneevent(self, flags=0):
+        """Process one event: idle callbacks, then one step of the script.
+
+        With the DONT_WAIT flag, only the idle callbacks and the next scripted
+        event (if it's not a None event) are pending.
+
+        Returns:
+            int: 1 if something was done, 0 if nothing is pending (only with
+                the DONT_WAIT flag)
+        """
+        if self.run_idle():
+            return 1
+        if flags & _tkinter.DONT_WAIT and (not self.script
+                                           or self.script[0][0] is None):
+            return 0
+        if not self.script:
+            # nothing will ever happen again: the user closes the window
+            self.protocols["WM_DELETE_WINDOW"]()
+            return 1
+        sequence, event = self.script.popleft()
+        if sequence is None:
+            # let the time pass until the next timer expires
+            while self._timers:
+                due, _, ident, func, args = heapq.heappop(self._timers)
+                if ident not in self._cancelled:
+                    self.clock = max(self.clock, due)
+                    func(*args)
+                    break
+        elif sequence in self.protocols:
+            self.protocols[sequence]()
+        elif sequence in self.bindings:
+            self.bindings[sequence](event)
+        return 1
+
+
+class _Image:
+    """Internal: stands for a tk.PhotoImage, the pixels of the framebuffer.
+
+    Pixels that were never put in the image are transparent.
+    """
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.raster = raster.Raster(width, height)
+        self.opaque = bytearray(width*height)
+        # modified since it was last drawn in the window?
+        self.changed = False
+        self._colors = {}
+
+    def blank(self):
+        """Make the whole image transparent."""
+        self.opaque = bytearray(self.width*self.height)
+        self.changed = True
+
+    def put(self, data, to=(0, 0)):
+        """Put rows of color strings at position to=(x, y)."""
+        x, y = to
+        for row in data:
+            line = bytearray()
+            for color in row:
+                if color not in self._colors:
+                    self._colors[color] = bytes(raster.parse_color(color))
+                line += self._colors[color]
+            k = y*self.width+x
+            self.raster.data[3*k:3*(k+len(row))] = line
+            self.opaque[k:k+len(row)] = b"\1"*len(row)
+            y += 1
+        self.changed = True
+
+    def draw(self, img, x, y):
+        """Draw the opaque pixels of this image in img at position (x, y)."""
+        # visible columns of the image
+        left, right = max(0, -x), min(self.width, img.width-x)
+        if left >= right:
+            return
+        for row in range(max(0, -y), min(self.height, img.height-y)):
+            k = row*self.width
+            o_k = (y+row)*img.width+x
+            if 0 not in self.opaque[k+left:k+right]:
+                # fast path: a whole opaque line
+                img.data[3*(o_k+left):3*(o_k+right)] = \
+                    self.raster.data[3*(k+left):3*(k+right)]
+                continue
+            for col in range(left, right):
+                if self.opaque[k+col]:
+                    img.data[3*(o_k+col):3*(o_k+col+1)] = \
+                        self.raster.data[3*(k+col):3*(k+col+1)]
+
+
+class _Item:
+    """Internal: a graphical object of the canvas."""
+
+    # pylint: disable=too-few-public-methods
+    # it's a record.
+    __slots__ = ("ident", "kind", "coords", "options", "tags")
+
+    def __init__(self, ident, kind, coords, options):
+        self.ident = ident
+        self.kind = kind
+        self.coords = [float(c) for c in coords]
+        self.tags = ()
+        self.options = {}
+        self.configure(options)
+
+    def configure(self, options):
+        """Change some options of this object."""
+        for key, value in options.items():
+            if value is None:
+                # ignored by tkinter
+                continue
+            if key == "tags":
+                self.tags = (value,) if isinstance(value, str) \
+                    else tuple(value)
+            else:
+                self.options[key] = value
+
+
+# pylint: disable=too-many-ancestors,too-many-public-methods
+# pylint: disable=too-many-instance-attributes
+# The tk canvas has too many already, and this class emulates it; all
+# attributes are private.
+class OffscreenScreen(tkd.Screen):
+    """A window of the tkdraw.screen module, drawn in memory.
+
+    All methods of `tkdraw.screen.Screen` are available, and the following
+    tkinter canvas methods: create_rectangle, create_oval, create_line,
+    create_text, create_image, coords, itemconfig, itemcget, type, move,
+    delete, tag_raise, tag_lower, addtag_withtag, dtag, find_all,
+    find_withtag.
+
+    Args:
+        size, pixels, grid, framebuffer, tile_cache, refresh_rate,
+            piece_pool, view: see `tkdraw.screen.Screen`
+        events (list, optional): the script of the events that will be
+            returned by wait_event(), see push_event() (default: no event,
+            the window is closed on the first wait_event())
+    """
+
+    # tk name of the canvas widget, for str() and repr()
+    _w = ".offscreen"
+    # no periodic wakeup in wait_event(): the time only passes with the
+    # None events of the script
+    _WAKEUP = None
+
+    def __init__(self, *args, events=(), **kwargs):
+        self._items = {}
+        self._order = []
+        self._count = 0
+        # last rendered image, number of objects drawn in it, and if it's
+        # still up to date or must be drawn again from scratch
+        self._raster = None
+        self._drawn = 0
+        self._dirty = True
+        self._script = list(events)
+        tkd.Screen.__init__(self, *args, **kwargs)
+
+    def _create_window(self, height, width):
+        """Internal: create the fake root window and the image."""
+        # pylint: disable=attribute-defined-outside-init
+        # it's called by __init__.
+        self.root = _Root()
+        self._height = height
+        self._width = width
+        for evt in self._script:
+            self.push_event(evt)
+
+    def _new_image(self, height, width):
+        """Internal: create an image of this size (transparent)."""
+        return _Image(height, width)
+
+    def _font(self, name, size):
+        """Internal: fonts are just described by a tuple, offscreen."""
+        return (name, size)
+
+    def _start_waker(self):
+        """Internal: nothing to do, waiting is never blocking offscreen."""
+
+    def _catch_signals(self):
+        """Internal: nothing to do, waiting is never blocking offscreen."""
+        self._sigpipe = ()
+
+    def close(self):
+        """Close this window.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        tkd.Screen.close(self)
+        self._items.clear()
+        self._order.clear()
+
+    def message(self, message):
+        """Display a message in a box and wait for the user to click somewhere.
+
+        The message is not displayed offscreen, just waits for an event.
+
+        Args:
+            message (str): the string to print
+
+        Returns:
+            bool: True if the user triggered a normal event, False if the user
+                closed the window abruptly.
+        """
+        evt = self.wait_event()
+        if evt[0] == "END":
+            # put the end msg back in the queue and return False
+            self._eventq.put(evt)
+            return False
+        return True
+
+    async def next_event(self, timeout=None):
+        """Wait for the user to interact with the window, asyncio version.
+
+        Offscreen, the scripted events are returned without waiting, and the
+        timeout expires on a None scripted event, as in wait_event().
+
+        Args:
+            timeout (float, optional): maximum waiting time in seconds
+                (default: wait forever)
+
+        Returns:
+            the event, as returned by wait_event(), or None if the timeout
+                expires.
+        """
+        # let the other tasks run
+        await asyncio.sleep(0)
+        return self.wait_event(None if timeout is None else
+                               max(int(timeout*1000), 1))
+
+    ###########################################################################
+    # scripted events and images                                              #
+    ###########################################################################
+    def push_event(self, evt):
+        """Add an event at the end of the script.
+
+        Args:
+            evt: an event, such as returned by wait_event(): `("click",
+                (line, column))` (a click on this tile of the window, the
+                board may be scrolled), `("motion", (line, column))` (the
+                mouse moves to the center of this tile), `("key", keysym)` or
+                `("END", None)`; or
+                None to let the time pass until the next timer expires (the
+                delay of wait_event() for example)
+
+        Returns:
+            None
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+        if evt is None:
+            self.root.script.append((None, None))
+        elif evt[0] == "click":
+            i, j = evt[1]
+            self.root.script.append(("<Button-1>", types.SimpleNamespace(
+                x=j*self.pixels+self.pixels//2+1,
+                y=i*self.pixels+self.pixels//2+1)))
+        elif evt[0] == "motion":
+            i, j = evt[1]
+            self.root.script.append(("<Motion>", types.SimpleNamespace(
+                x=j*self.pixels+self.pixels//2+1,
+                y=i*self.pixels+self.pixels//2+1)))
+        elif evt[0] == "key":
+            self.root.script.append(("<Any-KeyPress>",
+                                     types.SimpleNamespace(keysym=evt[1])))
+        elif evt[0] == "END":
+            self.root.script.append(("WM_DELETE_WINDOW", None))
+        else:
+            raise ValueError(f"unknown event {evt!r}")
+
+    def image(self):
+        """Return the content of the window as an image.
+
+        Returns:
+            tkdraw.raster.Raster: the image, don't modify it.
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+        self._fb_flush()
+        if self._fb is not None and self._fb.changed:
+            self._fb.changed = False
+            self._dirty = True
+        if self._dirty:
+            self._raster = raster.Raster(
+                self._width, self._height,
+                raster.parse_color(self.BACKGROUND))
+            self._drawn = 0
+            self._dirty = False
+        # draw the objects created since the last time
+        for ident in self._order[self._drawn:]:
+            self._render(self._items[ident])
+        self._drawn = len(self._order)
+        return self._raster
+
+    def pixel(self, pos):
+        """Return the color of a pixel of the window.
+
+        Args:
+            pos ([int, int]): pixel-wise position (line, column).
+                (0,0) = top-left position.
+
+        Returns:
+            (int, int, int): the red, green, blue values of the pixel (0-255)
+        """
+        return self.image().pixel(pos[1], pos[0])
+
+    def save(self, path):
+        """Save the content of the window in a PNG or PPM file.
+
+        Args:
+            path (str): name of the file, PNG if it ends with ".png", else PPM
+
+        Returns:
+            None
+        """
+        self.image().save(path)
+
+    def _render(self, item):
+        """Internal: draw one object in the image."""
+        if item.kind == "image":
+            # canvas coordinates start at 1 (0 is the highlight border)
+            if item.options.get("state") != tk.HIDDEN:
+                item.options["image"].draw(self._raster,
+                                           round(item.coords[0])-1,
+                                           round(item.coords[1])-1)
+        else:
+            self._raster.item(item.kind, item.coords, item.options)
+
+    def _snapshot(self):
+        """Internal: return a function making an image of the window."""
+        img = self.image().copy()
+        return lambda: img
+
+    ###########################################################################
+    # tkinter canvas emulation                                                #
+    ###########################################################################
+    def _create(self, itemType, args, kw):
+        """Internal: create an object on top of all others."""
+        if len(args) == 1:
+            args = args[0]
+        self._count += 1
+        self._items[self._count] = _Item(self._count, itemType, args, kw)
+        self._order.append(self._count)
+        return self._count
+
+    def create_rectangle(self, *args, **kw):
+        """Create a rectangle, see tkinter."""
+        return self._create("rectangle", args, kw)
+
+    def create_oval(self, *args, **kw):
+        """Create an oval, see tkinter."""
+        return self._create("oval", args, kw)
+
+    def create_line(self, *args, **kw):
+        """Create a line, see tkinter."""
+        return self._create("line", args, kw)
+
+    def create_text(self, *args, **kw):
+        """Create a text, see tkinter."""
+        return self._create("text", args, kw)
+
+    def create_image(self, *args, **kw):
+        """Create an image object, see tkinter."""
+        # the framebuffer is modified in place: always draw it again
+        self._dirty = True
+        return self._create("image", args, kw)
+
+    def _find(self, tag_or_id):
+        """Internal: the IDs of the objects matching a tag or ID, in order."""
+        if isinstance(tag_or_id, int) or str(tag_or_id).isdigit():
+            return [int(tag_or_id)] if int(tag_or_id) in self._items else []
+        if tag_or_id == tk.ALL:
+            return list(self._order)
+        if tag_or_id.startswith("!"):
+            return [i for i in self._order
+                    if tag_or_id[1:] not in self._items[i].tags]
+        return [i for i in self._order if tag_or_id in self._items[i].tags]
+
+    def find_all(self):
+        """Return the IDs of all objects, from bottom to top."""
+        return tuple(self._order)
+
+    def find_withtag(self, tagOrId):
+        """Return the IDs of the objects matching a tag or ID."""
+        return tuple(self._find(tagOrId))
+
+    def type(self, tagOrId):
+        """Return the type of the first object matching a tag or ID."""
+        found = self._find(tagOrId)
+        return self._items[found[0]].kind if found else None
+
+    def coords(self, *args):
+        """Get or set the coordinates of an object, see tkinter."""
+        tag_or_id, *args = args
+        found = self._find(tag_or_id)
+        if not found:
+            return []
+        item = self._items[found[0]]
+        if not args:
+            return list(item.coords)
+        if len(args) == 1:
+            args = args[0]
+        item.coords = [float(c) for c in args]
+        self._dirty = True
+        return None
+
+    def itemconfigure(self, tagOrId, cnf=None, **kw):
+        """Change some options of objects, see tkinter."""
+        if cnf:
+            kw.update(cnf)
+        for ident in self._find(tagOrId):
+            self._items[ident].configure(kw)
+        self._dirty = True
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, tagOrId, option):
+        """Return the value of an option of an object, see tkinter."""
+        found = self._find(tagOrId)
+        if not found:
+            raise tk.TclError(f"no item matches \"{tagOrId}\"")
+        item = self._items[found[0]]
+        if option == "tags":
+            return " ".join(item.tags)
+        return item.options.get(
+            option, self._DEFAULTS.get((item.kind, option), ""))
+
+    # default values of the options, as returned by tk
+    _DEFAULTS = {("rectangle", "outline"): "black",
+                 ("oval", "outline"): "black",
+                 ("line", "fill"): "black",
+                 ("text", "fill"): "black",
+                 ("rectangle", "width"): "1.0", ("oval", "width"): "1.0",
+                 ("line", "width"): "1.0"}
+
+    def move(self, *args):
+        """Move objects by an offset, see tkinter."""
+        tag_or_id, x_amount, y_amount = args
+        for ident in self._find(tag_or_id):
+            item = self._items[ident]
+            item.coords = [v+(x_amount if k % 2 == 0 else y_amount)
+                           for k, v in enumerate(item.coords)]
+        self._dirty = True
+
+    def delete(self, *args):
+        """Delete objects, see tkinter."""
+        found = set()
+        for tag_or_id in args:
+            found.update(self._find(tag_or_id))
+        if found:
+            self._order = [i for i in self._order if i not in found]
+            for ident in found:
+                del self._items[ident]
+            self._dirty = True
+
+    def addtag_withtag(self, newtag, tagOrId):
+        """Add a tag to objects, see tkinter."""
+        for ident in self._find(tagOrId):
+            item = self._items[ident]
+            if newtag not in item.tags:
+                item.tags += (newtag,)
+
+    def dtag(self, *args):
+        """Remove a tag from objects, see tkinter."""
+        tag_or_id = args[0]
+        tag_to_delete = args[1] if len(args) > 1 else tag_or_id
+        for ident in self._find(tag_or_id):
+            item = self._items[ident]
+            item.tags = tuple(t for t in item.tags if t != tag_to_delete)
+
+    def _restack(self, tag_or_id, ref, above):
+        """Internal: move objects above/below a reference object."""
+        moved = self._find(tag_or_id)
+        if ref is not None:
+            refs = self._find(ref)
+            if not refs:
+                raise tk.TclError(
+                    f"tagOrId \"{ref}\" doesn't match any items")
+        rest = [i for i in self._order if i not in moved]
+        if ref is None:
+            pos = len(rest) if above else 0
+        elif above:
+            pos = max(rest.index(i) for i in refs if i in rest)+1 \
+                if any(i in rest for i in refs) else len(rest)
+        else:
+            pos = min(rest.index(i) for i in refs if i in rest) \
+                if any(i in rest for i in refs) else 0
+        self._order = rest[:pos]+moved+rest[pos:]
+        self._dirty = True
+
+    def tag_raise(self, *args):
+        """Move objects to the foreground (or just above another one)."""
+        above = args[1] if len(args) > 1 else None
+        self._restack(args[0], above, True)
+
+    def tag_lower(self, *args):
+        """Move objects to the background (or just below another one)."""
+        below = args[1] if len(args) > 1 else None
+        self._restack(args[0], below, False)
+
+    def bind(self, sequence=None, func=None, add=None):
+        """Bind an event to a function (for the scripted events)."""
+        self.root.bindings[sequence] = func
+
+    def update(self):
+        """Run the idle callbacks, there are no other pending events."""
+        if self.root:
+            self.root.run_idle()
+
+    def update_idletasks(self):
+        """Run the idle callbacks."""
+        if self.root:
+            self.root.run_idle()
+
+    # pylint: disable=keyword-arg-before-vararg
+    # same signature as tkinter.
+    def after(self, ms, func=None, *args):
+        """Schedule func(*args) after ms milliseconds (simulated time)."""
+        return self.root.after(ms, func, *args)
+
+    def after_idle(self, func, *args):
+        """Schedule func(*args) when idle."""
+        return self.root.after_idle(func, *args)
+
+    def after_cancel(self, id):
+        """Cancel a scheduled function."""
+        # pylint: disable=redefined-builtin
+        # same name as tkinter.
+        self.root.after_cancel(id)
+
+    def winfo_rgb(self, color):
+        """Return the (red, green, blue) values of a color (0-65535)."""
+        try:
+            return tuple(257*v for v in raster.parse_color(color))
+        except ValueError as exc:
+            raise tk.TclError(str(exc)) from None
@@ -0,0 +1,416 @@
+"""Software rasterizer used by the tkdraw offscreen backend.
+
+This module draws rectangles, lines, ellipses and (approximate) text in an
+in-memory RGB image, and writes this image as a PPM or PNG file. It does not
+need tkinter, nor a display.
+
+The shape functions `line_points` and `ellipse_spans` only compute which
+pixels are covered, they can be used to draw in any kind of pixel buffer.
+
+Copyright 2018-2022, Vincent Loechner.
+Distributed under the MIT license (see LICENSE)
+https://github.com/vincentloechner/pytkdraw.git
+"""
+import math
+import struct
+import zlib
+
+
+# the color names of tk (X11 colors, see the colors(n) man page), in lower
+# case and without spaces: each name is followed by its value, or by the 5
+# values of name, name1, ..., name4. Every "gray" is also spelled "grey", and
+# gray0 to gray100 are computed.
+_TK_COLORS = """
+aliceblue f0f8ff  antiquewhite faebd7 ffefdb eedfcc cdc0b0 8b8378
+aqua 00ffff  aquamarine 7fffd4 7fffd4 76eec6 66cdaa 458b74
+azure f0ffff f0ffff e0eeee c1cdcd 838b8b  beige f5f5dc
+bisque ffe4c4 ffe4c4 eed5b7 cdb79e 8b7d6b  black 000000
+blanchedalmond ffebcd  blue 0000ff 0000ff 0000ee 0000cd 00008b
+blueviolet 8a2be2  brown a52a2a ff4040 ee3b3b cd3333 8b2323
+burlywood deb887 ffd39b eec591 cdaa7d 8b7355
+cadetblue 5f9ea0 98f5ff 8ee5ee 7ac5cd 53868b
+chartreuse 7fff00 7fff00 76ee00 66cd00 458b00
+chocolate d2691e ff7f24 ee7621 cd661d 8b4513
+coral ff7f50 ff7256 ee6a50 cd5b45 8b3e2f  cornflowerblue 6495ed
+cornsilk fff8dc fff8dc eee8cd cdc8b1 8b8878  crimson dc143c
+cyan 00ffff 00ffff 00eeee 00cdcd 008b8b  darkblue 00008b  darkcyan 008b8b
+darkgoldenrod b8860b ffb90f eead0e cd950c 8b6508  darkgray a9a9a9
+darkgreen 006400  darkkhaki bdb76b  darkmagenta 8b008b
+darkolivegreen 556b2f caff70 bcee68 a2cd5a 6e8b3d
+darkorange ff8c00 ff7f00 ee7600 cd6600 8b4500
+darkorchid 9932cc bf3eff b23aee 9a32cd 68228b  darkred 8b0000
+darksalmon e9967a  darkseagreen 8fbc8f c1ffc1 b4eeb4 9bcd9b 698b69
+darkslateblue 483d8b  darkslategray 2f4f4f 97ffff 8deeee 79cdcd 528b8b
+darkturquoise 00ced1  darkviolet 9400d3  debianred d70751
+deeppink ff1493 ff1493 ee1289 cd1076 8b0a50
+deepskyblue 00bfff 00bfff 00b2ee 009acd 00688b  dimgray 696969
+dodgerblue 1e90ff 1e90ff 1c86ee 1874cd 104e8b
+firebrick b22222 ff3030 ee2c2c cd2626 8b1a1a  floralwhite fffaf0
+forestgreen 228b22  fuchsia ff00ff  gainsboro dcdcdc  ghostwhite f8f8ff
+gold ffd700 ffd700 eec900 cdad00 8b7500
+goldenrod daa520 ffc125 eeb422 cd9b1d 8b6914  gray bebebe
+green 00ff00 00ff00 00ee00 00cd00 008b00  greenyellow adff2f
+honeydew f0fff0 f0fff0 e0eee0 c1cdc1 838b83
+hotpink ff69b4 ff6eb4 ee6aa7 cd6090 8b3a62
+indianred cd5c5c ff6a6a ee6363 cd5555 8b3a3a  indigo 4b0082
+ivory fffff0 fffff0 eeeee0 cdcdc1 8b8b83
+khaki f0e68c fff68f eee685 cdc673 8b864e  lavender e6e6fa
+lavenderblush fff0f5 fff0f5 eee0e5 cdc1c5 8b8386  lawngreen 7cfc00
+lemonchiffon fffacd fffacd eee9bf cdc9a5 8b8970
+lightblue add8e6 bfefff b2dfee 9ac0cd 68838b  lightcoral f08080
+lightcyan e0ffff e0ffff d1eeee b4cdcd 7a8b8b
+lightgoldenrod eedd82 ffec8b eedc82 cdbe70 8b814c
+lightgoldenrodyellow fafad2  lightgray d3d3d3  lightgreen 90ee90
+lightpink ffb6c1 ffaeb9 eea2ad cd8c95 8b5f65
+lightsalmon ffa07a ffa07a ee9572 cd8162 8b5742  lightseagreen 20b2aa
+lightskyblue 87cefa b0e2ff a4d3ee 8db6cd 607b8b  lightslateblue 8470ff
+lightslategray 778899  lightsteelblue b0c4de cae1ff bcd2ee a2b5cd 6e7b8b
+lightyellow ffffe0 ffffe0 eeeed1 cdcdb4 8b8b7a  lime 00ff00
+limegreen 32cd32  linen faf0e6  magenta ff00ff ff00ff ee00ee cd00cd 8b008b
+maroon b03060 ff34b3 ee30a7 cd2990 8b1c62  mediumaquamarine 66cdaa
+mediumblue 0000cd  mediumorchid ba55d3 e066ff d15fee b452cd 7a378b
+mediumpurple 9370db ab82ff 9f79ee 8968cd 5d478b  mediumseagreen 3cb371
+mediumslateblue 7b68ee  mediumspringgreen 00fa9a  mediumturquoise 48d1cc
+mediumvioletred c71585  midnightblue 191970  mintcream f5fffa
+mistyrose ffe4e1 ffe4e1 eed5d2 cdb7b5 8b7d7b  moccasin ffe4b5
+navajowhite ffdead ffdead eecfa1 cdb38b 8b795e  navy 000080
+navyblue 000080  oldlace fdf5e6  olive 808000
+olivedrab 6b8e23 c0ff3e b3ee3a 9acd32 698b22
+orange ffa500 ffa500 ee9a00 cd8500 8b5a00
+orangered ff4500 ff4500 ee4000 cd3700 8b2500
+orchid da70d6 ff83fa ee7ae9 cd69c9 8b4789  palegoldenrod eee8aa
+palegreen 98fb98 9aff9a 90ee90 7ccd7c 548b54
+paleturquoise afeeee bbffff aeeeee 96cdcd 668b8b
+palevioletred db7093 ff82ab ee799f cd6889 8b475d  papayawhip ffefd5
+peachpuff ffdab9 ffdab9 eecbad cdaf95 8b7765  peru cd853f
+pink ffc0cb ffb5c5 eea9b8 cd919e 8b636c
+plum dda0dd ffbbff eeaeee cd96cd 8b668b  powderblue b0e0e6
+purple a020f0 9b30ff 912cee 7d26cd 551a8b
+red ff0000 ff0000 ee0000 cd0000 8b0000
+rosybrown bc8f8f ffc1c1 eeb4b4 cd9b9b 8b6969
+royalblue 4169e1 4876ff 436eee 3a5fcd 27408b  saddlebrown 8b4513
+salmon fa8072 ff8c69 ee8262 cd7054 8b4c39  sandybrown f4a460
+seagreen 2e8b57 54ff9f 4eee94 43cd80 2e8b57
+seashell fff5ee fff5ee eee5de cdc5bf 8b8682
+sienna a0522d ff8247 ee7942 cd6839 8b4726  silver c0c0c0
+skyblue 87ceeb 87ceff 7ec0ee 6ca6cd 4a708b
+slateblue 6a5acd 836fff 7a67ee 6959cd 473c8b
+slategray 708090 c6e2ff b9d3ee 9fb6cd 6c7b8b
+snow fffafa fffafa eee9e9 cdc9c9 8b8989
+springgreen 00ff7f 00ff7f 00ee76 00cd66 008b45
+steelblue 4682b4 63b8ff 5cacee 4f94cd 36648b
+tan d2b48c ffa54f ee9a49 cd853f 8b5a2b  teal 008080
+thistle d8bfd8 ffe1ff eed2ee cdb5cd 8b7b8b
+tomato ff6347 ff6347 ee5c42 cd4f39 8b3626
+turquoise 40e0d0 00f5ff 00e5ee 00c5cd 00868b  violet ee82ee
+violetred d02090 ff3e96 ee3a8c cd3278 8b2252
+wheat f5deb3 ffe7ba eed8ae cdba96 8b7e66  white ffffff  whitesmoke f5f5f5
+yellow ffff00 ffff00 eeee00 cdcd00 8b8b00  yellowgreen 9acd32
+"""
+
+
+def _color_table():
+    """Internal: build the table of the color names, from _TK_COLORS."""
+    colors = {}
+    names = []
+    for word in _TK_COLORS.split():
+        if len(word) == 6 and all(c in "0123456789abcdef" for c in word):
+            name = names[0]+str(len(names)-1) if len(names) > 1 else names[0]
+            names.append(name)
+            colors[name] = tuple(int(word[k:k+2], 16) for k in (0, 2, 4))
+        else:
+            names = [word]
+    for k in range(101):
+        colors[f"gray{k}"] = (int(k*2.55+0.5),)*3
+    for name in list(colors):
+        if "gray" in name:
+            colors[name.replace("gray", "grey")] = colors[name]
+    return colors
+
+
+COLORS = _color_table()
+"""The tk color names and their (red, green, blue) values."""
+
+
+def parse_color(color):
+    """Convert a tk color string into a (red, green, blue) triplet.
+
+    Args:
+        color (str): a color name (see `COLORS`) or an RGB-style color such as
+            "#F00", "#FF0000" or "#FFFF00000000" for red.
+
+    Returns:
+        (int, int, int): the red, green and blue values (0-255), or None for
+            the empty string (no color, transparent).
+
+    Raises:
+        ValueError: if the color is unknown
+    """
+    if color == "":
+        return None
+    if color.startswith("#") and len(color) in (4, 7, 10, 13):
+        digits = (len(color)-1)//3
+        try:
+            values = [int(color[1+k*digits:1+(k+1)*digits], 16)
+                      for k in range(3)]
+        except ValueError:
+            raise ValueError(f"unknown color \"{color}\"") from None
+        # #rgb is #rrggbb, else keep the 8 most significant bits
+        return tuple(v*0x11 if digits == 1 else v >> (4*digits-8)
+                     for v in values)
+    try:
+        return COLORS[color.replace(" ", "").lower()]
+    except KeyError:
+        raise ValueError(f"unknown color \"{color}\"") from None
+
+
+def line_points(x_1, y_1, x_2, y_2):
+    """Yield the pixels (x, y) of a line from (x_1, y_1) to (x_2, y_2).
+
+    Bresenham's algorithm, the last point (x_2, y_2) is excluded.
+    """
+    d_x = abs(x_2-x_1)
+    d_y = -abs(y_2-y_1)
+    s_x = 1 if x_1 < x_2 else -1
+    s_y = 1 if y_1 < y_2 else -1
+    err = d_x+d_y
+    while x_1 != x_2 or y_1 != y_2:
+        yield x_1, y_1
+        err2 = 2*err
+        if err2 >= d_y:
+            err += d_y
+            x_1 += s_x
+        if err2 <= d_x:
+            err += d_x
+            y_1 += s_y
+
+
+def ellipse_spans(x_1, y_1, x_2, y_2):
+    """Yield the horizontal spans (y, xa, xb) filling an ellipse.
+
+    The ellipse is inscribed in the box from (x_1, y_1) to (x_2, y_2), and
+    each span covers the pixels xa <= x < xb of row y.
+    """
+    c_x, c_y = (x_1+x_2)/2, (y_1+y_2)/2
+    r_x, r_y = (x_2-x_1)/2, (y_2-y_1)/2
+    if r_x <= 0 or r_y <= 0:
+        return
+    for y in range(math.floor(y_1), math.ceil(y_2)):
+        d_y = (y+0.5-c_y)/r_y
+        if d_y*d_y > 1:
+            continue
+        half = r_x*math.sqrt(1-d_y*d_y)
+        x_a = math.floor(c_x-half+0.5)
+        x_b = math.floor(c_x+half+0.5)
+        if x_b > x_a:
+            yield y, x_a, x_b
+
+
+def ring_spans(x_1, y_1, x_2, y_2, width=1):
+    """Yield the horizontal spans (y, xa, xb) of the outline of an ellipse.
+
+    Same as `ellipse_spans`, for an outline of the given width centered on
+    the border of the ellipse.
+    """
+    half = width/2
+    inner = {y: (x_a, x_b) for y, x_a, x_b
+             in ellipse_spans(x_1+half, y_1+half, x_2-half, y_2-half)}
+    for y, x_a, x_b in ellipse_spans(x_1-half, y_1-half, x_2+half, y_2+half):
+        if y in inner:
+            yield y, x_a, inner[y][0]
+            yield y, inner[y][1], x_b
+        else:
+            yield y, x_a, x_b
+
+
+class Raster:
+    """An RGB image in memory, and functions to draw in it.
+
+    All coordinates are pixel-wise (x, y), (0, 0) is the top-left pixel.
+    Everything drawn outside of the image is clipped. Colors are (red, green,
+    blue) triplets of integers between 0 and 255.
+
+    Args:
+        width (int): width of the image (in pixels)
+        height (int): height of the image (in pixels)
+        color ((int, int, int), optional): background color (default: white)
+    """
+
+    def __init__(self, width, height, color=(255, 255, 255)):
+        self.width = width
+        self.height = height
+        self.data = bytearray(bytes(color)*(width*height))
+
+    def copy(self):
+        """Return a copy of this image."""
+        img = Raster(0, 0)
+        img.width, img.height, img.data = self.width, self.height, \
+            bytearray(self.data)
+        return img
+
+    def pixel(self, x, y):
+        """Return the color of the pixel (x, y)."""
+        k = 3*(y*self.width+x)
+        return tuple(self.data[k:k+3])
+
+    def hline(self, y, x_1, x_2, color):
+        """Draw the pixels x_1 <= x < x_2 of row y."""
+        x_1, x_2 = max(x_1, 0), min(x_2, self.width)
+        if 0 <= y < self.height and x_1 < x_2:
+            k = 3*(y*self.width)
+            self.data[k+3*x_1:k+3*x_2] = bytes(color)*(x_2-x_1)
+
+    def fill_rect(self, x_1, y_1, x_2, y_2, color):
+        """Fill the rectangle x_1 <= x < x_2, y_1 <= y < y_2."""
+        for y in range(max(y_1, 0), min(y_2, self.height)):
+            self.hline(y, x_1, x_2, color)
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    # the coordinates of two corners, and the drawing options.
+    def rect(self, x_1, y_1, x_2, y_2, fill=None, outline=None, width=1):
+        """Draw a rectangle, filled and/or with an outline of some width."""
+        if fill is not None:
+            self.fill_rect(x_1, y_1, x_2, y_2, fill)
+        if outline is not None and width > 0:
+            x_1, y_1 = x_1-width//2, y_1-width//2
+            x_2, y_2 = x_2+(width-1)//2, y_2+(width-1)//2
+            self.fill_rect(x_1, y_1, x_2, y_1+width, outline)
+            self.fill_rect(x_1, y_2-width, x_2, y_2, outline)
+            self.fill_rect(x_1, y_1, x_1+width, y_2, outline)
+            self.fill_rect(x_2-width, y_1, x_2, y_2, outline)
+
+    def line(self, x_1, y_1, x_2, y_2, color, width=1):
+        """Draw a line from (x_1, y_1) to (x_2, y_2) (excluded)."""
+        if width <= 1:
+            for x, y in line_points(x_1, y_1, x_2, y_2):
+                if 0 <= x < self.width and 0 <= y < self.height:
+                    k = 3*(y*self.width+x)
+                    self.data[k:k+3] = bytes(color)
+            return
+        half = width//2
+        for x, y in line_points(x_1, y_1, x_2, y_2):
+            self.fill_rect(x-half, y-half, x-half+width, y-half+width, color)
+
+    def ellipse(self, x_1, y_1, x_2, y_2, fill=None, outline=None, width=1):
+        """Draw an ellipse inscribed in the box (x_1, y_1)-(x_2, y_2)."""
+        if fill is not None:
+            for y, x_a, x_b in ellipse_spans(x_1, y_1, x_2, y_2):
+                self.hline(y, x_a, x_b, fill)
+        if outline is not None and width > 0:
+            for y, x_a, x_b in ring_spans(x_1, y_1, x_2, y_2, width):
+                self.hline(y, x_a, x_b, outline)
+
+    def text(self, x, y, text, color, size=11):
+        """Draw an approximation of a text centered in (x, y).
+
+        Each visible character is drawn as a small block, which gives the
+        right place and size of the text, but it can't be read.
+        """
+        # a font size is given in points, approximately 4/3 of a pixel
+        height = max(size*4//3, 2)
+        width = max(height*3//5, 2)
+        lines = text.split("\n")
+        top = y-height*len(lines)//2
+        for line in lines:
+            left = x-width*len(line)//2
+            for char in line:
+                if not char.isspace():
+                    self.fill_rect(left+1, top+height//4, left+width-1,
+                                   top+height-1, color)
+                left += width
+            top += height
+
+    def tiles(self, rows, size):
+        """Fill squares of size x size pixels from a 2D list of colors.
+
+        Args:
+            rows (list of list of str): the tk colors of the squares, the
+                first one being at the top-left corner of the image
+            size (int): size of a square (in pixels)
+        """
+        colors = {}
+        for i, row in enumerate(rows):
+            start = 0
+            for j in range(1, len(row)+1):
+                if j < len(row) and row[j] == row[start]:
+                    continue
+                # squares start..j-1 of this row have the same color
+                if row[start] not in colors:
+                    colors[row[start]] = parse_color(row[start])
+                self.fill_rect(start*size, i*size, j*size, (i+1)*size,
+                               colors[row[start]])
+                start = j
+
+    def item(self, kind, coords, options):
+        """Draw an object of a tk canvas.
+
+        Args:
+            kind (str): type of the object, "rectangle", "oval", "line" or
+                "text" (other objects are ignored)
+            coords (list of float): its canvas coordinates, the canvas
+                coordinates (1, 1) being the top-left pixel of the image (0 is
+                the highlight border of a tkdraw window)
+            options (dict): its tk options (fill, outline, width, state, and
+                text, font for a text), the colors being color strings
+        """
+        if options.get("state") == "hidden":
+            return
+        c = [round(v)-1 for v in coords]
+        width = int(float(options.get("width", 1)))
+        if kind == "rectangle":
+            self.rect(c[0], c[1], c[2], c[3],
+                      fill=parse_color(options.get("fill", "")),
+                      outline=parse_color(options.get("outline", "black")),
+                      width=width)
+        elif kind == "oval":
+            self.ellipse(c[0], c[1], c[2], c[3],
+                         fill=parse_color(options.get("fill", "")),
+                         outline=parse_color(options.get("outline", "black")),
+                         width=width)
+        elif kind == "line":
+            color = parse_color(options.get("fill", "black"))
+            if color is not None:
+                for k in range(0, len(c)-2, 2):
+                    self.line(c[k], c[k+1], c[k+2], c[k+3], color, width)
+        elif kind == "text":
+            font = options.get("font", ("", 11))
+            size = font[1] if isinstance(font, tuple) else font.cget("size")
+            color = parse_color(options.get("fill", "black"))
+            if color is not None:
+                self.text(c[0], c[1], str(options.get("text", "")), color,
+                          abs(int(size)))
+
+    def to_ppm(self):
+        """Return this image encoded as a binary PPM (P6) file."""
+        return b"P6\n%d %d\n255\n" % (self.width, self.height) \
+            + bytes(self.data)
+
+    def to_png(self):
+        """Return this image encoded as a PNG file."""
+        def chunk(kind, body):
+            return struct.pack(">I", len(body)) + kind + body \
+                + struct.pack(">I", zlib.crc32(kind+body) & 0xffffffff)
+
+        row = 3*self.width
+        raw = b"".join(b"\0" + self.data[y*row:(y+1)*row]
+                       for y in range(self.height))
+        return b"\x89PNG\r\n\x1a\n" \
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", self.width,
+                                         self.height, 8, 2, 0, 0, 0)) \
+            + chunk(b"IDAT", zlib.compress(raw)) \
+            + chunk(b"IEND", b"")
+
+    def save(self, path):
+        """Write this image to a file, PNG if its name ends with .png else PPM.
+
+        Args:
+            path (str): name of the file
+
+        Returns:
+            None
+        """
+        with open(path, "wb") as out:
+            if path.lower().endswith(".png"):
+                out.write(self.to_png())
+            else:
+                out.write(self.to_ppm())
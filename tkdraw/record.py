@@ -0,0 +1,245 @@
+"""Record the drawings of a tkdraw window, and replay them.
+
+A window records the calls of its drawing methods after
+`Screen.start_recording(path)`: the calls are written in a compact binary
+log, with their arguments, results and times. Replaying this log redraws
+exactly the same things in a new window, as fast as possible or in real time,
+optionally offscreen. This is useful to reproduce a bug, or as a
+deterministic load to profile tkdraw:
+```
+$ python3 -m tkdraw.record game.log --realtime
+$ python3 -m tkdraw.record game.log --backend offscreen --stats
+```
+
+The log starts with a header (magic string and version), followed by one
+record per call: its size and time (struct), and the call itself (marshal).
+The first record gives the options of the window.
+
+Copyright 2018-2022, Vincent Loechner.
+Distributed under the MIT license (see LICENSE)
+https://github.com/vincentloechner/pytkdraw.git
+"""
+import argparse
+import json
+import marshal
+import mmap
+import struct
+import sys
+import time
+
+import tkdraw.screen as tkd
+
+# numpy arrays given to blit() are recorded as lists
+try:
+    import numpy
+except ImportError:
+    # pylint: disable=invalid-name
+    numpy = None
+
+
+VERSION = 1
+"""Version of the log format."""
+
+# magic string and version
+_HEADER = struct.Struct("<4sH")
+# size of the marshalled call, and its time (s, since the start)
+_RECORD = struct.Struct("<Id")
+
+# methods returning new objects, and arguments that are objects
+_CREATE = ("draw_piece", "draw_tile", "draw_line", "draw_lines",
+           "draw_circle", "draw_rectangle", "draw_text", "draw_grid", "blit")
+# (position, name) in the arguments
+_OBJECTS = {"move_piece": [(0, "obj")], "move_tile": [(0, "obj")],
+            "update_text": [(0, "obj")], "rm": [(0, "obj")],
+            "bg": [(0, "obj"), (1, "before")],
+            "fg": [(0, "obj"), (1, "after")]}
+
+
+def _plain(value):
+    """Internal: convert a value to types that marshal can write."""
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+class Recorder:
+    """Writes the calls of a window in a log, see `Screen.start_recording`.
+
+    Args:
+        screen (tkdraw.screen.Screen): the recorded window
+        path (str): name of the log file
+    """
+
+    def __init__(self, screen, path):
+        self._screen = screen
+        # pylint: disable=consider-using-with
+        # the file is closed by close().
+        self._out = open(path, "wb")
+        self._start = time.perf_counter()
+        self._out.write(_HEADER.pack(b"TKDR", VERSION))
+        # pylint: disable=protected-access
+        # the recorder is a part of the window.
+        self._write(("__init__", (), screen._options, None))
+
+    def _write(self, call):
+        """Internal: append a call to the log."""
+        data = marshal.dumps(call)
+        self._out.write(_RECORD.pack(len(data),
+                                     time.perf_counter()-self._start)
+                        + data)
+        # written at once: the log is complete if the program crashes
+        self._out.flush()
+
+    def record(self, name, args, kwargs, result, elapsed):
+        """Record a call, observer of the window methods.
+
+        Only the calls made by the program are recorded, not the calls of a
+        method by another one, nor the calls that raised an exception.
+        """
+        # pylint: disable=unused-argument,too-many-arguments
+        # observers are given all details of the calls.
+        # pylint: disable=protected-access
+        # the recorder is a part of the window.
+        if self._screen._depth or isinstance(result, BaseException):
+            return
+        self._write((name, _plain(args), _plain(kwargs), _plain(result)))
+
+    def close(self):
+        """Close the log file."""
+        self._out.close()
+
+
+def read(path):
+    """Read a log, yield its records.
+
+    The file is mapped in memory, not read at once. A truncated last record
+    (the program crashed while writing it) is ignored.
+
+    Args:
+        path (str): name of the log file
+
+    Yields:
+        (float, str, tuple, dict, object): the time of each call, the name of
+            the method, its arguments and its result. The first record is the
+            "__init__" of the window, with its options as arguments.
+
+    Raises:
+        ValueError: if the file is not a log of this version
+    """
+    with open(path, "rb") as log, \
+            mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if len(data) < _HEADER.size \
+                or _HEADER.unpack_from(data) != (b"TKDR", VERSION):
+            raise ValueError(
+                f"{path} is not a tkdraw log (version {VERSION})")
+        offset = _HEADER.size
+        while offset+_RECORD.size <= len(data):
+            size, when = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            if offset+size > len(data):
+                return
+            name, args, kwargs, result = marshal.loads(
+                data[offset:offset+size])
+            offset += size
+            yield when, name, args, kwargs, result
+
+
+def _new_ids(ids, name, args, kwargs):
+    """Internal: replace the recorded objects given to a call by the new ones.
+
+    Returns:
+        list: the positional arguments, kwargs is changed in place
+    """
+    args = list(args)
+    for k, key in _OBJECTS.get(name, ()):
+        if k < len(args):
+            args[k] = ids.get(args[k], args[k])
+        elif key in kwargs:
+            kwargs[key] = ids.get(kwargs[key], kwargs[key])
+    return args
+
+
+def replay(path, realtime=False, backend=None, stats=False):
+    """Replay a log in a new window.
+
+    The recorded calls are done again, with the IDs of the new objects in
+    place of the recorded ones. wait_event() and poll_events() are not
+    called: the window is just refreshed, the recorded events are known.
+
+    Args:
+        path (str): name of the log file
+        realtime (bool, optional): if True, do the calls at the recorded
+            times, else as fast as possible (default: False)
+        backend (str, optional): backend of the window, see
+            `tkdraw.screen.Screen` (default: None)
+        stats (bool, optional): enable the stats of the window (default:
+            False), see `tkdraw.screen.Screen.stats`
+
+    Returns:
+        tkdraw.screen.Screen: the window, still open, as it was at the end of
+            the recording.
+    """
+    records = read(path)
+    _, name, _, options, _ = next(records)
+    if name != "__init__":
+        raise ValueError(f"{path}: the window was not recorded")
+    win = tkd.Screen(backend=backend, **options)
+    if stats:
+        win.enable_stats()
+    ids = {}
+    start = time.perf_counter()
+    for when, name, args, kwargs, result in records:
+        if realtime:
+            time.sleep(max(start+when-time.perf_counter(), 0))
+        if name in ("wait_event", "poll_events"):
+            win.refresh()
+            continue
+        args = _new_ids(ids, name, args, kwargs)
+        new = getattr(win, name)(*args, **kwargs)
+        # objects created
+        if name in _CREATE:
+            if isinstance(result, list):
+                ids.update(zip(result, new))
+            elif result is not None:
+                ids[result] = new
+    win.refresh()
+    return win
+
+
+def main(argv=None):
+    """Command line interface, see `python3 -m tkdraw.record --help`."""
+    parser = argparse.ArgumentParser(
+        prog="python3 -m tkdraw.record",
+        description="Replay a tkdraw log.")
+    parser.add_argument("log", help="the log file")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay at the recorded speed, not at full "
+                        "speed")
+    parser.add_argument("--backend", choices=["tk", "offscreen"],
+                        help="backend of the window (default: "
+                        "$TKDRAW_BACKEND or tk)")
+    parser.add_argument("--stats", action="store_true",
+                        help="print the stats of the window (JSON)")
+    parser.add_argument("--wait", action="store_true",
+                        help="wait for the window to be closed at the end")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    win = replay(args.log, args.realtime, args.backend, args.stats)
+    elapsed = time.perf_counter()-start
+    if args.stats:
+        print(json.dumps(dict(win.stats(), time=elapsed), indent=2))
+    else:
+        print(f"replayed in {elapsed:.3f}s")
+    if args.wait:
+        while win.wait_event()[0] != "END":
+            pass
+    win.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,8 +16,32 @@ Distributed under the MIT license (see LICENSE)
 https://github.com/vincentloechner/pytkdraw.git
 """
 
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import os
+import re
+import signal
+import threading
+import time
 import tkinter as tk
+import tkinter.font
 import queue
+import _tkinter
+
+from tkdraw import raster
+
+# pylint: disable=too-many-lines
+# the module is mostly the Screen class, the whole interface.
+
+# numpy is optional, used to speed up blit() when it's available
+try:
+    import numpy
+except ImportError:
+    # pylint: disable=invalid-name
+    numpy = None
 
 
 # pylint: disable=too-many-ancestors
@@ -50,7 +74,36 @@ class Screen(tk.Canvas):
             horizontal and vertical lines (default: True) - the real size of
             the window is also increased by one pixel to draw the right/bottom
             lines
-
+        framebuffer (bool): if True, the tiles are not separate graphical
+            objects but colored pixels of a single image, which is much faster
+            and uses a constant amount of memory (default: None, meaning True
+            when `pixels` is 1 and `grid` is False)
+        tile_cache (bool): if True, keeps at most one tile per grid position:
+            filling an already filled tile changes its color instead of
+            creating a new object on top of it (default: False)
+        refresh_rate (int): maximum number of refreshes per second done by
+            the drawing functions (refresh=True): the changes made between
+            two refreshes are shown together, at the end of the refresh
+            period if tk runs (waiting for an event, refresh()), or by the
+            next drawing. A program that sleeps (time.sleep) doesn't let tk
+            run: call refresh() before sleeping, to show everything that was
+            drawn. 0 refreshes at each drawing (default: 60)
+        piece_pool (int): maximum number of deleted pieces kept hidden, to
+            be reused by draw_piece instead of creating new objects. Good for
+            speed when pieces are often deleted and drawn again (default: 0,
+            no reuse)
+        view ([int, int]): a couple (height, width), the size of the visible
+            part of the board, in tiles (default: None, the whole board is
+            visible). The window only shows this part, see scroll_to(). The
+            tiles and pieces are then kept in a model of the board, and only
+            the visible ones are drawn, using a fixed set of graphical objects
+            reused when scrolling: their IDs are not the IDs of graphical
+            objects, and there is at most one tile and one piece per grid
+            position. The clicks are still given in board positions
+        backend (str): "tk" to open a real window, or "offscreen" to draw in
+            an image in memory, without any display (see `tkdraw.offscreen`).
+            Default: the TKDRAW_BACKEND environment variable if it is set,
+            else "tk".
 
     Returns:
         The window object.
@@ -66,29 +119,58 @@ class Screen(tk.Canvas):
             <https://docs.python.org/3/library/tkinter.html>
     """
 
-    # pylint: disable=too-many-instance-attributes
-    # it is reasonable here, and many are private.
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    # it is reasonable here, many attributes are private and the methods are
+    # the interface of the module.
+    def __new__(cls, *args, backend=None, **kwargs):
+        """Internal: choose the class of the window from the backend."""
+        if backend is None:
+            backend = os.environ.get("TKDRAW_BACKEND", "tk")
+        if backend not in ("tk", "offscreen"):
+            raise ValueError(f"unknown backend \"{backend}\"")
+        klass = cls
+        if backend == "offscreen" and cls is Screen:
+            # pylint: disable=import-outside-toplevel,cyclic-import
+            # tkdraw.offscreen extends this module.
+            from tkdraw.offscreen import OffscreenScreen
+            klass = OffscreenScreen
+        return super().__new__(klass)
+
+    # pylint: disable=unused-argument
+    # backend is used by __new__.
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    # pylint: disable=too-many-statements
+    # self doesn't count, all are optional, and it sets the whole window up.
+    # pylint: disable=super-init-not-called
+    # the canvas is created by _create_window().
     def __init__(
-        self, size=(8, 8), pixels=100, grid=True
+        self, size=(8, 8), pixels=100, grid=True, framebuffer=None,
+        tile_cache=False, refresh_rate=60, piece_pool=0, view=None,
+        backend=None
     ):
         # some private methods below, to react to asynchronous events:
 
         # private: the user clicked on a square
         def _click(evenement):
             # min to handle user clicking on the last pixel:
-            i = min((evenement.y-1)//self.pixels, self.size[0]-1)
-            j = min((evenement.x-1)//self.pixels, self.size[1]-1)
+            i = min((evenement.y-1)//self.pixels, self._view[0]-1)
+            j = min((evenement.x-1)//self.pixels, self._view[1]-1)
+            # position in the board, if it's scrolled
+            i, j = i+self._origin[0], j+self._origin[1]
             # add the event (line, column) to the queue
             self._eventq.put(("click", (i, j)))
-            # and leave the mainloop
-            self.root.quit()
+
+        # private: the mouse moved
+        def _motion(evenement):
+            # just keep the last position, mouse_position() reads it
+            self._souris = (evenement.y, evenement.x)
+            if self._motion_rate and self._motion_id is None:
+                self._post_motion()
 
         # private: the user hit a key
         def _key(evenement):
             # put the event in the queue
             self._eventq.put(("key", evenement.keysym))
-            # and leave the mainloop
-            self.root.quit()
 
         # private: the user closed the window
         def _async_end():
@@ -97,24 +179,139 @@ class Screen(tk.Canvas):
             # and close
             self.close()
 
-        # private: regularily check if some events are pending in the queue
-        # and wake up
-        def _checke():
-            self._after_id = self.root.after(1000, _checke)
-            # stop mainloop
-            self.root.quit()
-
         #################################
         # INIT
+        # no window yet: close() does nothing if the options are wrong
+        self.root = None
+        # the options of this window, to open it again (see tkdraw.record)
+        self._options = {"size": tuple(size), "pixels": pixels, "grid": grid,
+                         "framebuffer": framebuffer, "tile_cache": tile_cache,
+                         "refresh_rate": refresh_rate,
+                         "piece_pool": piece_pool,
+                         "view": None if view is None else tuple(view)}
         self.size = size
         self.pixels = pixels
-        self._after_id = None
         self._gap = int(grid)  # 1 more pixel if grid is True
-
-        self._eventq = queue.Queue()
+        if view is not None and (framebuffer or view[0] > size[0]
+                                 or view[1] > size[1]):
+            raise ValueError("the view must be a part of the board, and "
+                             "a framebuffer can't be scrolled!")
+        # viewport: size of the visible part, and its top-left grid position
+        self._view = tuple(size if view is None else view)
+        self._origin = (0, 0)
+        # viewport: the tiles (color, border) and pieces (color) of the model
+        # by ID, and the objects showing the visible ones, with their content
+        self._model = None
+        self._model_count = 0
+        self._slots = []
+        if view is not None:
+            self._model = {}
+
+        self._eventq = _EventQueue()
+        # drawing commands sent by other threads (see threadsafe()), and the
+        # lock protecting them from close()
+        self._thread = threading.get_ident()
+        self._commands = collections.deque()
+        self._commands_lock = threading.Lock()
+        self._closed = False
+        self._waker = None
+        self._waker_id = None
+        self._woken = False
+        # signals (Ctrl-C) caught while waiting (see _catch_signals()): the
+        # wakeup pipe, the previous SIGINT handler, the pending signals, and
+        # if the window is waiting
+        self._sigpipe = None
+        self._sigint = None
+        self._signals = []
+        self._waiting = False
         self._idd = None
+        # mouse: last position, and the motion events (see enable_motion()):
+        # their maximum rate, last tile, and pending timer
         self._souris = (0, 0)
+        self._motion_rate = 0
+        self._motion_cell = None
+        self._motion_id = None
+        # coalesced refreshes: minimum time between two refreshes (s), time
+        # of the next one, and pending idle refresh
+        self._refresh_period = 1/refresh_rate if refresh_rate else 0
+        self._refresh_next = 0.0
+        self._refresh_id = None
+        # framebuffer (pixel mode): the image, its content and modified rows
+        self._fb = None
+        self._fb_rows = None
+        self._fb_dirty = set()
+        # pixel mode: lines, circles and rectangles are drawn in the image too
+        self._fb_draw = False
+        # colors: palette of the handles, and cache of the color strings
+        self._palette = []
+        self._handles = {}
+        self._colors = collections.OrderedDict()
+        # fonts of draw_text, by (name, size)
+        self._fonts = {}
+        # instrumentation: number of calls and time of each method, the
+        # observers of the methods, and the depth of the observed calls
+        self._stats = {}
+        self._stats_on = False
+        self._observers = {}
+        self._depth = 0
+        self._recorder = None
+        self._capture = None
+        # grid index: tile and piece IDs of each grid position k (stacks, the
+        # last one drawn on top, only the occupied positions), and position
+        # of each tile and piece
+        self._tile_cache = tile_cache
+        self._tiles = {}
+        self._tile_pos = {}
+        self._piece_cells = {}
+        self._piece_pos = {}
+        # draw_grid state: last matrix, its pieces, and position of each piece
+        self._board = None
+        self._board_pieces = None
+        self._board_pos = {}
+        self._board_grid = grid
+        # piece pool: hidden pieces ready to be reused (an ordered set, the
+        # last one parked is reused first)
+        self._pool_size = piece_pool
+        self._pool = {}
+        self._pool_hits = 0
+        self._pool_misses = 0
+        # layers: objects of each layer, layer of each object, hidden layers
+        self._layers = {}
+        self._layer_of = {}
+        self._hidden_layers = set()
+
+        self._create_window(self._view[0]*self.pixels+self._gap,
+                            self._view[1]*self.pixels+self._gap)
+
+        # binds the click function to the click event
+        self.bind("<Button-1>", _click)
+        # binds the key function to the keypress event
+        self.bind("<Any-KeyPress>", _key)
+        # tracks the mouse, once and for all
+        self.bind("<Motion>", _motion)
+
+        # ensure that async_end is called if the window is killed
+        self.root.protocol("WM_DELETE_WINDOW", _async_end)
+
+        # the players colors, resolved once, by color of DEFAULT_COLOR: it
+        # may still be changed
+        self._player_colors = {}
+
+        # pixel mode: all the tiles are stored in a single image
+        if framebuffer is None:
+            framebuffer = pixels == 1 and not grid and view is None
+        if framebuffer:
+            self._fb = self._new_image(self.size[0]*self.pixels,
+                                       self.size[1]*self.pixels)
+            self._fb_reset()
+            self._fb_draw = pixels == 1
 
+        # draw the original state
+        if grid or view is not None:
+            self.erase()
+
+    def _create_window(self, height, width):
+        """Internal: create the tk root window and the canvas in it."""
         self.root = tk.Tk()
         # you can create other widgets here if you want to
         # self.frame = tk.Frame(root)
@@ -123,9 +320,9 @@ class Screen(tk.Canvas):
         tk.Canvas.__init__(
                 self,
                 self.root,
-                height=self.size[0]*self.pixels+self._gap,
-                width=self.size[1]*self.pixels+self._gap,
-                background="#ddd",
+                height=height,
+                width=width,
+                background=self.BACKGROUND,
                 takefocus=True,
                 borderwidth=0,
                 highlightthickness=1)
@@ -133,19 +330,17 @@ class Screen(tk.Canvas):
         # self.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
         self.focus_set()
 
-        # binds the click function to the click event
-        self.bind("<Button-1>", _click)
-        # binds the key function to the keypress event
-        self.bind("<Any-KeyPress>", _key)
+    def _new_image(self, height, width):
+        """Internal: create an image of this size (transparent)."""
+        return tk.PhotoImage(master=self.root, height=height, width=width)
 
-        # checke will be called once per second
-        self._after_id = self.root.after(1000, _checke)
-        # ensure that async_end is called if the window is killed
-        self.root.protocol("WM_DELETE_WINDOW", _async_end)
-
-        # draw the original state
-        if grid:
-            self.draw_grid()
+    def _font(self, name, size):
+        """Internal: return the font of this name and size, created once."""
+        font = self._fonts.get((name, size))
+        if font is None:
+            font = tkinter.font.Font(root=self.root, family=name, size=size)
+            self._fonts[(name, size)] = font
+        return font
 
     def __enter__(self):
         """Internal: With -as: statement compatibility."""
@@ -168,12 +363,21 @@ class Screen(tk.Canvas):
         Returns:
             None
         """
-        if self._after_id is not None:
-            self.root.after_cancel(self._after_id)
-            self._after_id = None
         if self.root is not None:
+            # the other threads can't send commands anymore
+            with self._commands_lock:
+                self._closed = True
+            self._fb = None
+            self._fonts.clear()
+            self._refresh_id = None
+            self._stop_waker()
+            self._release_signals()
             self.root.destroy()
             self.root = None
+            # the commands of other threads will never be done
+            self._run_commands()
+            self.stop_recording()
+            self.stop_capture()
 
     def message(self, message):
         """Display a message in a box and wait for the user to click somewhere.
@@ -190,7 +394,6 @@ class Screen(tk.Canvas):
         # it's an event, don't care which one.
         def _c(event):
             self._eventq.put("ok")
-            self.root.quit()
 
         if not self.root:
             raise InterruptedError("window killed")
@@ -221,16 +424,27 @@ class Screen(tk.Canvas):
     # or the None special value (-> nothing there)                            #
     ###########################################################################
 
+    BACKGROUND = "#ddd"
+    """The background color of the window."""
+
     # by default define those 10 colors:
     DEFAULT_COLOR = ["black", "white", "red", "green", "blue",
                      "yellow", "cyan", "magenta", "orange", "darkgrey"]
-    """A list of ten colors used for ten players identified by numbers."""
+    """A list of ten colors used for ten players identified by numbers.
+
+    It may be changed, for the class or a window, at any time."""
 
     def draw_grid(
         self, matrix=None, grid=True
     ):
         """Draw a complete grid of pieces, using the 10 default colors.
 
+        The first call erases everything and draws the whole board. The next
+        calls only update the pieces that changed since the previous call
+        (created, recolored or deleted), the grid lines are left as they are.
+        Everything is drawn again after a call to erase(), or if the `grid`
+        argument changes.
+
         Args:
             matrix (list of list of int): the players pieces matrix, of the
                 specified size. If matrix is None (default), just ignores it.
@@ -238,36 +452,41 @@ class Screen(tk.Canvas):
                 to separate the tiles.
 
         Returns:
-            list of int: the graphical objects that were created for the pieces
-                (grid excluded).
+            list of int: the graphical objects of the pieces (grid excluded).
         """
         if not self.root:
             raise InterruptedError("window killed")
-        # erase everything for a start
-        self.delete(tk.ALL)
-        # gap is used by draw_tile to fill the inside of a tile (including
-        # borders, or not
-        if grid:
-            for i in range(self.size[0]+self._gap):
-                self.create_line(1, i*self.pixels+1,
-                                 self.size[1]*self.pixels+1, i*self.pixels+1,
-                                 width=1)
-            for i in range(self.size[1]+self._gap):
-                self.create_line(i*self.pixels+1, 1,
-                                 i*self.pixels+1,
-                                 self.size[0]*self.pixels+1+self._gap,
-                                 width=1)
-        # draw the pieces
-        lobj = []
-        if matrix is not None:
-            for i in range(self.size[0]):
-                for j in range(self.size[1]):
-                    if matrix[i][j] is not None:
-                        lobj.append(self.draw_piece((i, j), matrix[i][j],
-                                    refresh=False))
+        if self._board is None or self._board_grid != grid:
+            # erase everything for a start
+            self._clear(grid)
+            self._board = [None]*(self.size[0]*self.size[1])
+            self._board_pieces = [None]*(self.size[0]*self.size[1])
+            self._board_grid = grid
+
+        # draw the pieces that changed since the last call
+        for i in range(self.size[0]):
+            for j in range(self.size[1]):
+                k = i*self.size[1]+j
+                player = None if matrix is None else matrix[i][j]
+                if player == self._board[k]:
+                    continue
+                obj = self._board_pieces[k]
+                if player is None:
+                    self.rm(obj, refresh=False)
+                    continue
+                if obj is None:
+                    obj = self.draw_piece((i, j), player, refresh=False)
+                    self._board_pieces[k] = obj
+                    self._board_pos[obj] = k
+                elif self._model is not None:
+                    self._model[obj] = self._player_color(player)
+                    self._view_update(k)
+                else:
+                    self.itemconfig(obj, fill=self._player_color(player))
+                self._board[k] = player
         # update just once at the end, for performance
-        self.update()
-        return lobj
+        self._auto_refresh()
+        return [obj for obj in self._board_pieces if obj is not None]
 
     def erase(
         self
@@ -284,10 +503,74 @@ class Screen(tk.Canvas):
         """
         if not self.root:
             raise InterruptedError("window killed")
-        self.delete(tk.ALL)
         # redraw the grid if it was there:
+        self._clear(self._gap == 1)
         if self._gap == 1:
-            self.draw_grid()
+            self._auto_refresh()
+
+    # tag of the grid lines
+    _GRID_TAG = "tkdraw_grid"
+
+    def _clear(self, grid):
+        """Internal: delete all objects, and draw the grid lines if needed.
+
+        The grid lines are kept if they are already there.
+        """
+        if grid and self.find_withtag(self._GRID_TAG):
+            self.delete("!"+self._GRID_TAG)
+        else:
+            self.delete(tk.ALL)
+            if grid:
+                self._draw_grid_lines()
+        self._pool.clear()
+        self._forget_index()
+        self._forget_board()
+        self._layers.clear()
+        self._layer_of.clear()
+        if self._fb is not None:
+            self._fb_reset()
+        if self._model is not None:
+            self._model.clear()
+            self._create_slots()
+
+    def _draw_grid_lines(self):
+        """Internal: draw the grid, whatever its size, using two objects.
+
+        All horizontal lines are drawn by a single zigzag line, each line
+        being joined to the next one along the left or right border of the
+        grid, which is drawn anyway. Same thing for the vertical lines.
+        """
+        bottom = self._view[0]*self.pixels+1
+        right = self._view[1]*self.pixels+1
+        # horizontal lines, left to right then right to left
+        coords = []
+        for i in range(self._view[0]+1):
+            ends = (1, right) if i % 2 == 0 else (right, 1)
+            coords.extend((ends[0], i*self.pixels+1, ends[1], i*self.pixels+1))
+        # the last point of a line is not drawn: go one pixel further
+        coords[-2] += 1 if self._view[0] % 2 == 0 else -1
+        self.create_line(*coords, width=1, tags=self._GRID_TAG)
+        # vertical lines, top to bottom then bottom to top
+        coords = []
+        for j in range(self._view[1]+1):
+            ends = (1, bottom) if j % 2 == 0 else (bottom, 1)
+            coords.extend((j*self.pixels+1, ends[0], j*self.pixels+1, ends[1]))
+        coords[-1] += 1 if self._view[1] % 2 == 0 else -1
+        self.create_line(*coords, width=1, tags=self._GRID_TAG)
+
+    def _forget_board(self, obj=None):
+        """Internal: forget the state of draw_grid, or just one of its pieces.
+
+        Called when all objects (or this piece) were deleted or moved.
+        """
+        if obj is None:
+            self._board = None
+            self._board_pieces = None
+            self._board_pos.clear()
+        elif obj in self._board_pos:
+            k = self._board_pos.pop(obj)
+            self._board[k] = None
+            self._board_pieces[k] = None
 
     ###########################################################################
     # INTERMEDIATE LEVEL INTERFACE                                            #
@@ -296,7 +579,7 @@ class Screen(tk.Canvas):
     def draw_piece(
         self, pos, player=0,
         color=None,
-        refresh=True
+        refresh=True, layer=None
     ):
         """Draw a piece in position pos=(line, column), player-colored.
 
@@ -308,35 +591,79 @@ class Screen(tk.Canvas):
                 position. (0, 0) = top-left position.
             player (int, optional): player number (default: 0)
                 player is used only if color is NOT given.
-            color (str, optional): fill color of the piece. If a color is
-                given, player is ignored.
-            refresh (bool): refresh the window after drawing (default: True)
+            color (str or int, optional): fill color of the piece, a color
+                string or a handle returned by color(). If a color is given,
+                player is ignored.
+            refresh (bool): refresh the window after drawing (default: True),
+                at most refresh_rate times per second: the last drawings may
+                be shown later (see `Screen`, refresh_rate=0 to refresh at
+                each drawing)
+            layer (str, optional): name of the layer of the object (default:
+                None), see show_layer()
 
         Returns:
-            int: the ID of the graphical object (circle) that was created.
+            int: the ID of the graphical object (circle) that was created, or
+                of a deleted piece that was reused (see `piece_pool`).
         """
         if not self.root:
             raise InterruptedError("window killed")
         if color is None:
-            if isinstance(player, int):
-                color = self.DEFAULT_COLOR[player % len(self.DEFAULT_COLOR)]
-            else:
-                color = self.DEFAULT_COLOR[0]
+            color = self._player_color(player)
+        else:
+            color = self._resolve(color)
 
         bord = self.pixels//10+1
         i, j = pos
         if not (0 <= i < self.size[0] and 0 <= j < self.size[1]):
             raise ValueError("trying to draw outside the window!")
 
-        obj = self.create_oval(j*self.pixels+bord+1,
-                               i*self.pixels+bord+1,
-                               (j+1)*self.pixels-bord+1,
-                               (i+1)*self.pixels-bord+1,
-                               width=1, fill=color)
+        if self._model is not None:
+            if layer is not None:
+                raise ValueError("a scrolled window has no layers!")
+            obj = self._view_new(self._piece_cells, self._piece_pos,
+                                 i*self.size[1]+j, color)
+            if refresh:
+                self._auto_refresh()
+            return obj
+
+        if self._pool:
+            # reuse a deleted piece, as if it was a new one
+            obj, _ = self._pool.popitem()
+            self.coords(obj,
+                        j*self.pixels+bord+1,
+                        i*self.pixels+bord+1,
+                        (j+1)*self.pixels-bord+1,
+                        (i+1)*self.pixels-bord+1)
+            self.itemconfig(obj, width=1, outline="black", fill=color,
+                            state=tk.NORMAL)
+            self.tag_raise(obj)
+            for tag in self._layer_tags(layer):
+                self.addtag_withtag(tag, obj)
+            self._pool_hits += 1
+        else:
+            obj = self.create_oval(j*self.pixels+bord+1,
+                                   i*self.pixels+bord+1,
+                                   (j+1)*self.pixels-bord+1,
+                                   (i+1)*self.pixels-bord+1,
+                                   width=1, fill=color,
+                                   tags=self._layer_tags(layer))
+            if self._pool_size:
+                self._pool_misses += 1
+        self._layer_add((obj,), layer)
+        self._index(self._piece_cells, self._piece_pos, obj, i*self.size[1]+j)
         if refresh:
-            self.update()
+            self._auto_refresh()
         return obj
 
+    def _player_color(self, player):
+        """Internal: return the color of a player number."""
+        colors = self.DEFAULT_COLOR
+        color = colors[player % len(colors) if isinstance(player, int) else 0]
+        rgb = self._player_colors.get(color)
+        if rgb is None:
+            rgb = self._player_colors[color] = self._resolve(color)
+        return rgb
+
     def move_piece(
         self, obj, pos, refresh=True
     ):
@@ -346,7 +673,9 @@ class Screen(tk.Canvas):
             obj (int): a previously created piece ID
             pos ([int, int]): new grid position, a couple (line, column)
             refresh (bool, optional): refresh the window after drawing
-                (default: True)
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
 
         Returns:
             None
@@ -357,6 +686,17 @@ class Screen(tk.Canvas):
         i, j = pos
         if not (0 <= i < self.size[0] and 0 <= j < self.size[1]):
             raise ValueError("trying to move a piece outside the window!")
+        # a piece of draw_grid moved by hand no longer belongs to the board
+        self._forget_board(obj)
+        if self._model is not None:
+            self._view_move(self._piece_cells, self._piece_pos, obj,
+                            i*self.size[1]+j)
+            if refresh:
+                self._auto_refresh()
+            return
+        if obj in self._piece_pos:
+            self._index(self._piece_cells, self._piece_pos, obj,
+                        i*self.size[1]+j)
         bord = self.pixels//10+1
         self.coords(
             obj,
@@ -366,25 +706,35 @@ class Screen(tk.Canvas):
             (i+1)*self.pixels-bord+1
             )
         if refresh:
-            self.update()
+            self._auto_refresh()
 
     def draw_tile(
         self, pos,
         color="black",
         border=0,
-        refresh=True
+        refresh=True, layer=None
     ):
         """Fill a tile in position pos=(line, column) with a color.
 
         Args:
             pos ([int, int]): grid position (line, column)
-            color (str, optional): color of the tile (default: "black")
+            color (str or int, optional): color of the tile, a color string
+                or a handle returned by color() (default: "black")
             border (int, optional): border thickness (default: 0) - borders may
                 overlap over neighboring tiles
-            refresh (bool): refresh the window after drawing (default: True)
+            refresh (bool): refresh the window after drawing (default: True),
+                at most refresh_rate times per second: the last drawings may
+                be shown later (see `Screen`, refresh_rate=0 to refresh at
+                each drawing)
+            layer (str, optional): name of the layer of the object (default:
+                None), see show_layer()
 
         Returns:
-            int: the ID of the colored tile
+            int: the ID of the colored tile, or None in framebuffer mode (the
+                tile is then a part of the window image, not an object,
+                unless it's in a layer).
+                With the tile cache, the ID of the tile that was already at
+                this position is returned if there was one.
         """
         if not self.root:
             raise InterruptedError("window killed")
@@ -392,14 +742,45 @@ class Screen(tk.Canvas):
         i, j = pos
         if not (0 <= i < self.size[0] and 0 <= j < self.size[1]):
             raise ValueError("trying to fill a tile outside the window!")
+        color = self._resolve(color)
+
+        if self._fb is not None and layer is None:
+            # pixel mode: just remember the color, sent to tk on refresh
+            self._fb_rows[i][j] = color
+            self._fb_dirty.add(i)
+            if refresh:
+                self._auto_refresh()
+            return None
+
+        k = i*self.size[1]+j
+        if self._model is not None:
+            if layer is not None:
+                raise ValueError("a scrolled window has no layers!")
+            obj = self._view_tile(k, (color, border))
+            if refresh:
+                self._auto_refresh()
+            return obj
+
+        if self._tile_cache:
+            obj = self._top(self._tiles, k)
+            if obj is not None:
+                # already a tile there: just change its color
+                self.itemconfig(obj, width=border, fill=color)
+                self._layer_move(obj, layer)
+                if refresh:
+                    self._auto_refresh()
+                return obj
 
         obj = self.create_rectangle(j*self.pixels+1+self._gap,
                                     i*self.pixels+1+self._gap,
                                     (j+1)*self.pixels+1,
                                     (i+1)*self.pixels+1,
-                                    width=border, fill=color)
+                                    width=border, fill=color,
+                                    tags=self._layer_tags(layer))
+        self._layer_add((obj,), layer)
+        self._index(self._tiles, self._tile_pos, obj, k)
         if refresh:
-            self.update()
+            self._auto_refresh()
         return obj
 
     def move_tile(
@@ -407,11 +788,15 @@ class Screen(tk.Canvas):
     ):
         """Move a colored tile to another grid position.
 
+        With the tile cache, a tile that was at the new position is deleted.
+
         Args:
             obj (int): a previously created tile ID
             pos ([int, int]): new position in the grid (line, column)
             refresh (bool, optional): refresh the window after drawing
-                (default: True)
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
 
         Returns:
             None
@@ -422,6 +807,21 @@ class Screen(tk.Canvas):
         i, j = pos
         if not (0 <= i < self.size[0] and 0 <= j < self.size[1]):
             raise ValueError("trying to move a tile outside the window!")
+        if self._model is not None:
+            self._view_move(self._tiles, self._tile_pos, obj, i*self.size[1]+j)
+            if refresh:
+                self._auto_refresh()
+            return
+        if obj in self._tile_pos:
+            k = i*self.size[1]+j
+            covered = self._top(self._tiles, k)
+            if self._tile_cache and covered not in (None, obj):
+                # only one tile per position: the covered one is deleted
+                self._index(self._tiles, self._tile_pos, covered)
+                self._layer_remove(covered)
+                self._forget_board(covered)
+                self.delete(covered)
+            self._index(self._tiles, self._tile_pos, obj, k)
         self.coords(
             obj,
             j*self.pixels+1++self._gap,
@@ -430,16 +830,18 @@ class Screen(tk.Canvas):
             (i+1)*self.pixels+1
             )
         if refresh:
-            self.update()
+            self._auto_refresh()
 
     ###########################################################################
     # low level interface:                                                    #
     # draw pixels, lines, circles, etc.                                       #
     ###########################################################################
-    # pylint: disable=too-many-arguments
-    # self doesn't count, and 3 are optionial
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    # self doesn't count, and the options are given in order by most
+    # programs: draw_line(x_1, x_2, "red").
     def draw_line(
-        self, x_1, x_2, color="black", thickness=1, refresh=True
+        self, x_1, x_2, color="black", thickness=1, refresh=True,
+        layer=None
     ):
         """Draw a line between x_1=(l1, c1) and x_2=(l2, c2) (excluded).
 
@@ -448,26 +850,96 @@ class Screen(tk.Canvas):
                 point. (0,0) = top-left position.
             x_2 ([int, int]): pixel-wise positions (line, column) of the second
                 point, excluded.
-            color (str, optional): line color (default: "black")
+            color (str or int, optional): line color, a color string or a
+                handle returned by color() (default: "black")
             thickness (int, optional): thickness of the line (default: 1)
             refresh (bool, optional): refresh the window after drawing
-                (default: True)
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+            layer (str, optional): name of the layer of the object (default:
+                None), see show_layer()
 
         Returns:
-            int: the ID of the graphical object that was created.
+            int: the ID of the graphical object that was created, or None in
+                pixel mode (framebuffer and pixels=1: the line is then drawn
+                in the window image, it's not an object, unless it's in a
+                layer).
         """
         if not self.root:
             raise InterruptedError("window killed")
 
+        if self._fb_draw and layer is None:
+            self._fb_line(x_1, x_2, self._resolve(color), thickness)
+            if refresh:
+                self._auto_refresh()
+            return None
+
         obj = self.create_line(x_1[1]+1, x_1[0]+1, x_2[1], x_2[0],
-                               width=thickness, fill=color)
+                               width=thickness, fill=self._resolve(color),
+                               tags=self._layer_tags(layer))
+        self._layer_add((obj,), layer)
         if refresh:
-            self.update()
+            self._auto_refresh()
         return obj
 
+    def draw_lines(
+        self, x_1, x_2, color="black", thickness=1, refresh=True,
+        layer=None
+    ):
+        """Draw many lines at once, between x_1[k] and x_2[k] (excluded).
+
+        Same as calling draw_line for each line, faster. In pixel mode, all
+        the lines are drawn in the window image, and shown by a single
+        refresh: good to plot a lot of segments.
+
+        Args:
+            x_1 (list of [int, int]): pixel-wise positions (line, column) of
+                the first points, a list or a Nx2 numpy array
+            x_2 (list of [int, int]): pixel-wise positions (line, column) of
+                the second points, excluded
+            color (str or int, optional): color of the lines, a color string
+                or a handle returned by color() (default: "black")
+            thickness (int, optional): thickness of the lines (default: 1)
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+            layer (str, optional): name of the layer of the object (default:
+                None), see show_layer()
+
+        Returns:
+            list of int: the IDs of the graphical objects that were created,
+                or None in pixel mode (unless they are in a layer).
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+        if numpy is not None:
+            if isinstance(x_1, numpy.ndarray):
+                x_1 = x_1.tolist()
+            if isinstance(x_2, numpy.ndarray):
+                x_2 = x_2.tolist()
+        if len(x_1) != len(x_2):
+            raise ValueError("as many first points as second points!")
+        color = self._resolve(color)
+
+        objs = None
+        if self._fb_draw and layer is None:
+            for p_1, p_2 in zip(x_1, x_2):
+                self._fb_line(p_1, p_2, color, thickness)
+        else:
+            tags = self._layer_tags(layer)
+            objs = [self.create_line(p_1[1]+1, p_1[0]+1, p_2[1], p_2[0],
+                                     width=thickness, fill=color, tags=tags)
+                    for p_1, p_2 in zip(x_1, x_2)]
+            self._layer_add(objs, layer)
+        if refresh:
+            self._auto_refresh()
+        return objs
+
     def draw_circle(
         self, x_1, x_2,
-        color="black", border=1, refresh=True
+        color="black", border=1, refresh=True, layer=None
     ):
         """Draw a circle in the bounding box of x_1=(l1,c1) and x_2 (excluded).
 
@@ -476,28 +948,114 @@ class Screen(tk.Canvas):
                 point. (0,0) = top-left position.
             x_2 ([int, int]): pixel-wise positions (line, column) of the second
                 point, excluded.
-            color (str, optional): color of the inside (default: "black").
+            color (str or int, optional): color of the inside, a color
+                string or a handle returned by color() (default: "black").
                 If color == None, don't fill the circle.
             border (int, optional): border thickness (default: 1) - borders can
                 overflow over the given pixels coordinates
             refresh (bool, optional): refresh the window after drawing
-                (default: True)
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+            layer (str, optional): name of the layer of the object (default:
+                None), see show_layer()
 
         Returns:
-            int: the ID of the graphical object that was created.
+            int: the ID of the graphical object that was created, or None in
+                pixel mode (the circle is drawn in the window image, unless
+                it's in a layer).
         """
         if not self.root:
             raise InterruptedError("window killed")
 
+        if self._fb_draw and layer is None:
+            # midpoint spans of the inside, and of the border (black), in
+            # the same box as the canvas oval
+            box = (x_1[1], x_1[0], x_2[1]-1, x_2[0]-1)
+            if color is not None:
+                color = self._resolve(color)
+                for y, x_a, x_b in raster.ellipse_spans(*box):
+                    self._fb_span(y, x_a, x_b, color)
+            if border > 0:
+                black = self._resolve("black")
+                for y, x_a, x_b in raster.ring_spans(*box, border):
+                    self._fb_span(y, x_a, x_b, black)
+            if refresh:
+                self._auto_refresh()
+            return None
+
         obj = self.create_oval(x_1[1]+1, x_1[0]+1, x_2[1], x_2[0],
-                               width=border, fill=color)
+                               width=border, fill=self._resolve(color),
+                               tags=self._layer_tags(layer))
+        self._layer_add((obj,), layer)
         if refresh:
-            self.update()
+            self._auto_refresh()
+        return obj
+
+    def draw_rectangle(
+        self, x_1, x_2,
+        color="black", border=0, refresh=True, layer=None
+    ):
+        """Draw a rectangle from x_1=(l1, c1) to x_2=(l2, c2) (excluded).
+
+        Args:
+            x_1 ([int, int]): pixel-wise positions (line, column) of the
+                top-left corner. (0,0) = top-left position.
+            x_2 ([int, int]): pixel-wise positions (line, column) of the
+                bottom-right corner, excluded.
+            color (str or int, optional): color of the inside, a color
+                string or a handle returned by color() (default: "black").
+                If color == None, don't fill the rectangle.
+            border (int, optional): border thickness (default: 0) - borders can
+                overflow over the given pixels coordinates
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+            layer (str, optional): name of the layer of the object (default:
+                None), see show_layer()
+
+        Returns:
+            int: the ID of the graphical object that was created, or None in
+                pixel mode (the rectangle is drawn in the window image,
+                unless it's in a layer).
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        if self._fb_draw and layer is None:
+            (l_1, c_1), (l_2, c_2) = x_1, x_2
+            if color is not None:
+                color = self._resolve(color)
+                for y in range(l_1, l_2):
+                    self._fb_span(y, c_1, c_2, color)
+            if border > 0:
+                # the border is centered on the edges, as in tk
+                black = self._resolve("black")
+                l_1, c_1 = l_1-border//2, c_1-border//2
+                l_2, c_2 = l_2+(border-1)//2, c_2+(border-1)//2
+                for y in range(l_1, l_2):
+                    if y < l_1+border or y >= l_2-border:
+                        self._fb_span(y, c_1, c_2, black)
+                    else:
+                        self._fb_span(y, c_1, c_1+border, black)
+                        self._fb_span(y, c_2-border, c_2, black)
+            if refresh:
+                self._auto_refresh()
+            return None
+
+        obj = self.create_rectangle(x_1[1]+1, x_1[0]+1, x_2[1]+1, x_2[0]+1,
+                                    width=border, fill=self._resolve(color),
+                                    tags=self._layer_tags(layer))
+        self._layer_add((obj,), layer)
+        if refresh:
+            self._auto_refresh()
         return obj
 
     def draw_text(
         self, position, text,
-        color="black", fontname="Purisa", fontsize=11, refresh=True
+        color="black", fontname="Purisa", fontsize=11, refresh=True,
+        layer=None
     ):
         """Draw a text centered at a given position=(line, column).
 
@@ -505,11 +1063,16 @@ class Screen(tk.Canvas):
             position ([int, int]): pixel-wise position (line, column).
                 (0,0) = top-left position.
             text (str): text to print
-            color (str, optional): text color (default: "black")
+            color (str or int, optional): text color, a color string or a
+                handle returned by color() (default: "black")
             fontname (str, optional): font name (default: "Purisa")
             fontsize (int, optional): font size (default: 11pt)
             refresh (bool, optional): refresh the window after drawing
-                (default: True)
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+            layer (str, optional): name of the layer of the object (default:
+                None), see show_layer()
 
         Returns:
             int: the ID of the graphical object that was created.
@@ -519,12 +1082,45 @@ class Screen(tk.Canvas):
 
         obj = self.create_text(position[1]+1, position[0]+1,
                                text=text,
-                               font=(fontname, fontsize),
-                               fill=color)
+                               font=self._font(fontname, fontsize),
+                               fill=self._resolve(color),
+                               tags=self._layer_tags(layer))
+        self._layer_add((obj,), layer)
         if refresh:
-            self.update()
+            self._auto_refresh()
         return obj
 
+    def update_text(
+        self, obj, text, color=None, refresh=True
+    ):
+        """Change the text of a text object, and its color if given.
+
+        Much faster than deleting the text and drawing a new one, to display a
+        score or a status line for example.
+
+        Args:
+            obj (int): a text ID returned by draw_text
+            text (str): the new text
+            color (str or int, optional): the new text color, a color string
+                or a handle returned by color() (default: None, unchanged)
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+
+        Returns:
+            None
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        if color is None:
+            self.itemconfig(obj, text=text)
+        else:
+            self.itemconfig(obj, text=text, fill=self._resolve(color))
+        if refresh:
+            self._auto_refresh()
+
     # pylint: disable=invalid-name
     # I'm too lazy to write 'background/foreground'.
     def bg(
@@ -537,7 +1133,9 @@ class Screen(tk.Canvas):
             before (int, optional): the object behind which to hide (default:
                 all)
             refresh (bool, optional): refresh the window after drawing
-                (default: True)
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
 
         Returns:
             None
@@ -547,7 +1145,7 @@ class Screen(tk.Canvas):
 
         self.tag_lower(obj, before)
         if refresh:
-            self.update()
+            self._auto_refresh()
 
     def fg(
         self, obj, after=None, refresh=True
@@ -559,7 +1157,9 @@ class Screen(tk.Canvas):
             after (int, optional): the object after which to show up (default:
                 all)
             refresh (bool, optional): refresh the window after drawing
-                (default: True)
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
 
         Returns:
             None
@@ -573,7 +1173,7 @@ class Screen(tk.Canvas):
             self.tag_raise(obj)
 
         if refresh:
-            self.update()
+            self._auto_refresh()
 
     def refresh(
         self
@@ -595,7 +1195,523 @@ class Screen(tk.Canvas):
         if not self.root:
             raise InterruptedError("window killed")
 
+        self._run_commands()
+        self._fb_flush()
+        self._cancel_refresh()
         self.update()
+        self._refreshed()
+
+    def _auto_refresh(self):
+        """Internal: refresh after drawing, at most once per refresh period.
+
+        The first drawing of a period is shown at once, the next ones by a
+        single refresh at the end of the period (a tk timer, so it needs tk
+        to run: any refresh, or waiting for an event), or by the first
+        drawing of the next period.
+        """
+        if not self._refresh_period:
+            self._fb_flush()
+            self.update()
+            self._refreshed()
+            return
+        now = time.perf_counter()
+        if now >= self._refresh_next:
+            self._refresh_next = now+self._refresh_period
+            self._cancel_refresh()
+            self._fb_flush()
+            # just redraw, the events are handled when waiting for them
+            self.update_idletasks()
+            self._refreshed()
+        elif self._refresh_id is None:
+            self._refresh_id = self.root.after(
+                max(int((self._refresh_next-now)*1000), 1),
+                self._timed_refresh)
+
+    def _timed_refresh(self):
+        """Internal: the pending refresh, at the end of the period."""
+        self._refresh_id = None
+        self._refresh_next = time.perf_counter()+self._refresh_period
+        self._fb_flush()
+        self.update_idletasks()
+        self._refreshed()
+
+    def _flush_refresh(self):
+        """Internal: do the pending refresh now, if any."""
+        if self._refresh_id is not None:
+            self._cancel_refresh()
+            self._fb_flush()
+            self.update_idletasks()
+            self._refreshed()
+
+    def _cancel_refresh(self):
+        """Internal: cancel the pending refresh, if any."""
+        if self._refresh_id is not None:
+            self.root.after_cancel(self._refresh_id)
+            self._refresh_id = None
+
+    def _refreshed(self):
+        """Internal: the window was repainted, capture it if needed."""
+        if self._capture is not None:
+            self._capture.refreshed(self._snapshot)
+
+    ###########################################################################
+    # instrumentation                                                         #
+    ###########################################################################
+    STATS_METHODS = ("draw_grid", "erase", "draw_piece", "move_piece",
+                     "draw_tile", "move_tile", "draw_line", "draw_lines",
+                     "draw_circle", "draw_rectangle", "draw_text",
+                     "update_text", "blit", "bg", "fg", "refresh", "rm",
+                     "show_layer", "hide_layer", "clear_layer", "move_layer",
+                     "raise_layer", "lower_layer", "wait_event",
+                     "poll_events", "update",
+                     "update_idletasks")
+    """The methods that are counted and timed when the stats are enabled."""
+
+    def enable_stats(self, enable=True):
+        """Enable (or disable) counting and timing the calls of the methods.
+
+        The instrumented methods are listed in STATS_METHODS, including tk's
+        update() to count the refreshes. When disabled (by default), there is
+        no overhead at all. Disabling does not reset the counters.
+
+        Args:
+            enable (bool, optional): enable or disable (default: True)
+
+        Returns:
+            None
+        """
+        if enable == self._stats_on:
+            return
+        self._stats_on = enable
+        if enable:
+            self._observe(self.STATS_METHODS, self._count_call)
+        else:
+            self._unobserve(self.STATS_METHODS, self._count_call)
+
+    def _count_call(self, name, args, kwargs, result, elapsed):
+        """Internal: observer counting and timing the calls (see _observe)."""
+        # pylint: disable=unused-argument,too-many-arguments
+        # observers are given all details of the calls.
+        stat = self._stats.setdefault(name, [0, 0.0])
+        stat[0] += 1
+        stat[1] += elapsed
+
+    def _observe(self, names, observer):
+        """Internal: call observer after each call of these methods.
+
+        The observer is called with the name of the method, its arguments
+        (tuple and dict), its result (or the exception it raised) and the
+        duration of the call (s). Nested calls are observed too, see _depth.
+        """
+        for name in names:
+            observers = self._observers.get(name)
+            if observers is None:
+                observers = self._observers[name] = []
+                # an instance attribute hides the method of the class
+                setattr(self, name,
+                        self._observed(name, getattr(self, name), observers))
+            observers.append(observer)
+
+    def _unobserve(self, names, observer):
+        """Internal: stop calling observer after these methods."""
+        for name in names:
+            observers = self._observers[name]
+            observers.remove(observer)
+            if not observers:
+                del self._observers[name]
+                delattr(self, name)
+
+    def _observed(self, name, method, observers):
+        """Internal: return the method, calling the observers after it."""
+        @functools.wraps(method)
+        def observed(*args, **kwargs):
+            start = time.perf_counter()
+            self._depth += 1
+            result = None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            # pylint: disable=broad-except
+            # the observers are told, and the exception is raised again.
+            except BaseException as exc:
+                result = exc
+                raise
+            finally:
+                self._depth -= 1
+                elapsed = time.perf_counter()-start
+                for observer in list(observers):
+                    observer(name, args, kwargs, result, elapsed)
+        return observed
+
+    def reset_stats(self):
+        """Reset all counters of the stats to zero.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        for stat in self._stats.values():
+            stat[0], stat[1] = 0, 0.0
+        self._pool_hits = self._pool_misses = 0
+        self._eventq.dropped = self._eventq.coalesced = 0
+
+    @contextlib.contextmanager
+    def profile(self):
+        """Context manager measuring the calls of the methods in a block.
+
+        The stats are enabled and reset when entering the block, and disabled
+        when leaving it (unless they were enabled before).
+
+        Example:
+            ```
+            with g.profile():
+                ... # draw things
+            print(g.stats())
+            ```
+        """
+        enabled = self._stats_on
+        self.enable_stats()
+        self.reset_stats()
+        try:
+            yield self
+        finally:
+            self.enable_stats(enabled)
+
+    def stats(self):
+        """Return the statistics of this window.
+
+        Args:
+            None
+
+        Returns:
+            dict: "methods": for each method called since the last reset, a
+                dict giving the number of calls ("count") and the total time
+                spent in it ("time", seconds, including the methods it calls);
+                "updates": number of calls to tk's update or update_idletasks;
+                "items": the number of graphical objects in the window;
+                "pool": number of pieces reused by draw_piece ("hits"), drawn
+                as new objects since the pool was empty ("misses"), and kept
+                hidden in the piece pool ("parked");
+                "capture": number of frames written ("frames") and dropped
+                ("dropped") by the current capture, or None;
+                "events": number of events waiting in the queue ("queued"),
+                dropped ("dropped") and coalesced ("coalesced") since it's
+                full, see limit_events().
+        """
+        capture = None
+        if self._capture is not None:
+            capture = {"frames": self._capture.frames,
+                       "dropped": self._capture.dropped}
+        methods = {name: {"count": count, "time": spent}
+                   for name, (count, spent) in self._stats.items() if count}
+        return {
+            "methods": methods,
+            "updates": sum(methods.get(name, {"count": 0})["count"]
+                           for name in ("update", "update_idletasks")),
+            "items": len(self.find_all())-len(self._pool) if self.root else 0,
+            "pool": {"hits": self._pool_hits, "misses": self._pool_misses,
+                     "parked": len(self._pool)},
+            "capture": capture,
+            "events": {"queued": len(self._eventq),
+                       "dropped": self._eventq.dropped,
+                       "coalesced": self._eventq.coalesced},
+        }
+
+    ###########################################################################
+    # recording                                                               #
+    ###########################################################################
+    RECORD_METHODS = ("draw_grid", "erase", "draw_piece", "move_piece",
+                      "draw_tile", "move_tile", "draw_line", "draw_lines",
+                      "draw_circle", "draw_rectangle", "draw_text",
+                      "update_text", "blit", "bg", "fg", "refresh", "rm",
+                      "show_layer", "hide_layer", "clear_layer",
+                      "move_layer", "raise_layer", "lower_layer",
+                      "scroll_to", "scroll", "color",
+                      "wait_event", "poll_events")
+    """The methods whose calls are recorded by start_recording()."""
+
+    def start_recording(self, path):
+        """Record all calls of the drawing methods in a file, to replay them.
+
+        The calls of the methods listed in RECORD_METHODS are written in a
+        compact binary log, with their arguments, results (the events returned
+        by wait_event for example) and times. Start recording just after
+        opening the window, the log is replayed in a new window. The
+        recording stops when the window is closed. See `tkdraw.record` to
+        replay a log.
+
+        Args:
+            path (str): name of the log file
+
+        Returns:
+            None
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        # tkdraw.record extends this module.
+        from tkdraw.record import Recorder
+
+        if not self.root:
+            raise InterruptedError("window killed")
+        self.stop_recording()
+        self._recorder = Recorder(self, path)
+        self._observe(self.RECORD_METHODS, self._recorder.record)
+
+    def stop_recording(self):
+        """Stop recording the calls, and close the log file.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self._recorder is not None:
+            self._unobserve(self.RECORD_METHODS, self._recorder.record)
+            self._recorder.close()
+            self._recorder = None
+
+    ###########################################################################
+    # frame capture                                                           #
+    ###########################################################################
+    def start_capture(self, target, every_n_refreshes=1, fmt="ppm",
+                      wait=False):
+        """Capture the content of the window at each refresh.
+
+        The frames are images of the whole window, written as binary PPM
+        images or raw RGB data (3 bytes per pixel, row by row, no header) by a
+        background thread. The window only takes a snapshot of its objects at
+        each captured refresh, the thread draws and writes it. If the thread
+        is late by several frames, the new frames are dropped, unless wait is
+        True. The capture stops when the window is closed. See
+        `tkdraw.capture` to make a video with ffmpeg.
+
+        Note:
+            tk can't read the pixels of a canvas: a tk window redraws its
+                objects in the captured images, with an approximation of the
+                texts (blocks in place of the characters).
+
+        Args:
+            target (str or file): a file name, a file name pattern such as
+                "frame%04d.ppm" to write each frame in its own file, or a
+                binary file object (the stdin of an ffmpeg process for
+                example)
+            every_n_refreshes (int, optional): capture one refresh out of
+                every_n_refreshes (default: 1)
+            fmt (str, optional): "ppm" or "raw" (default: "ppm")
+            wait (bool, optional): wait for the thread rather than dropping
+                frames (default: False)
+
+        Returns:
+            None
+        """
+        # pylint: disable=import-outside-toplevel
+        # tkdraw.capture starts a thread, only needed here.
+        from tkdraw.capture import Capture
+
+        if not self.root:
+            raise InterruptedError("window killed")
+        if every_n_refreshes < 1:
+            raise ValueError("every_n_refreshes must be positive")
+        self.stop_capture()
+        self._capture = Capture(target, every_n_refreshes, fmt, wait)
+
+    def stop_capture(self):
+        """Stop capturing, once the last frames are written.
+
+        Args:
+            None
+
+        Returns:
+            dict: the number of "frames" written and of "dropped" frames, or
+                None if the window wasn't captured.
+
+        Raises:
+            OSError: if the frames could not be written
+        """
+        capture, self._capture = self._capture, None
+        if capture is None:
+            return None
+        return capture.close()
+
+    # options of the objects drawn in a snapshot
+    _SNAPSHOT_OPTIONS = {"rectangle": ("fill", "outline", "width", "state"),
+                         "oval": ("fill", "outline", "width", "state"),
+                         "line": ("fill", "width", "state"),
+                         "text": ("fill", "text", "font", "state")}
+
+    def _snapshot(self):
+        """Internal: return a function making an image of the window.
+
+        The objects are read now, they are drawn by the function.
+        """
+        items = []
+        for obj in self.find_all():
+            kind = self.type(obj)
+            options = {key: self.itemcget(obj, key)
+                       for key in self._SNAPSHOT_OPTIONS.get(kind, ())}
+            if not options or options["state"] == tk.HIDDEN:
+                continue
+            for key in ("fill", "outline"):
+                if key in options:
+                    options[key] = self._resolve(options[key])
+            if kind == "text":
+                options["font"] = ("", int(self.tk.call(
+                    "font", "actual", options["font"], "-size")))
+            items.append((kind, self.coords(obj), options))
+        # the framebuffer, below all other objects
+        rows = None
+        if self._fb is not None:
+            rows = [list(row) for row in self._fb_rows]
+        size = (int(self.cget("width")), int(self.cget("height")))
+        background = raster.parse_color(self._resolve(self.BACKGROUND))
+
+        def draw():
+            img = raster.Raster(size[0], size[1], background)
+            if rows is not None:
+                img.tiles(rows, self.pixels)
+            for kind, coords, options in items:
+                img.item(kind, coords, options)
+            return img
+        return draw
+
+    ###########################################################################
+    # colors                                                                  #
+    ###########################################################################
+    COLOR_CACHE_SIZE = 256
+    """Number of color names kept in the cache of resolved colors."""
+
+    # "#rgb" and "#rrggbb" color strings, converted without tk
+    _RGB = re.compile("#[0-9a-fA-F]{3}(?:[0-9a-fA-F]{3})?")
+
+    def color(self, color):
+        """Return a handle of a color, faster to use than a color string.
+
+        All drawing functions accept a handle in place of a color string. The
+        color is resolved once and for all by tk, and using its handle
+        avoids any further color lookup.
+
+        Example:
+            ```
+            red = g.color("red")
+            for i in range(8):
+                g.draw_tile((i, i), red)
+            ```
+        Args:
+            color (str): a tkinter-compatible color string, such as "red" or
+                "#FF0000"
+
+        Returns:
+            int: the handle of this color (a small integer)
+
+        Raises:
+            ValueError: if the color is a handle unknown to this window
+        """
+        if isinstance(color, int):
+            self._resolve(color)
+            return color
+        rgb = self._resolve(color)
+        if rgb not in self._handles:
+            self._handles[rgb] = len(self._palette)
+            self._palette.append(rgb)
+        return self._handles[rgb]
+
+    def _resolve(self, color):
+        """Internal: convert a color string or handle to a "#rrggbb" string.
+
+        RGB strings are just normalized, the last resolved color names are
+        kept in a cache (LRU). A handle must be one of this window's, not a
+        bool.
+        """
+        if isinstance(color, int):
+            if isinstance(color, bool) or not 0 <= color < len(self._palette):
+                raise ValueError(f"unknown color handle {color!r}")
+            return self._palette[color]
+        if not color:
+            # None or "": no color
+            return color
+        if self._RGB.fullmatch(color):
+            # already RGB, such as the pixels of an image: no need to ask tk
+            if len(color) == 4:
+                return "#"+"".join(c+c for c in color[1:]).lower()
+            return color.lower()
+        try:
+            self._colors.move_to_end(color)
+            return self._colors[color]
+        except KeyError:
+            pass
+        red, green, blue = (v >> 8 for v in self.winfo_rgb(color))
+        rgb = f"#{red:02x}{green:02x}{blue:02x}"
+        self._colors[color] = rgb
+        if len(self._colors) > self.COLOR_CACHE_SIZE:
+            self._colors.popitem(last=False)
+        return rgb
+
+    ###########################################################################
+    # framebuffer (pixel mode)                                                #
+    ###########################################################################
+    def _fb_reset(self):
+        """Internal: clear the framebuffer and put its image in the canvas."""
+        self._fb_rows = [[self.BACKGROUND]*self.size[1]
+                         for _ in range(self.size[0])]
+        self._fb_dirty.clear()
+        self._fb.blank()
+        # below all other objects, the grid lines included
+        self.tag_lower(self.create_image(1, 1, image=self._fb, anchor=tk.NW))
+
+    def _fb_flush(self):
+        """Internal: send the modified rows of the framebuffer to tk.
+
+        Contiguous modified rows are sent at once, in a single put() call.
+        """
+        if not self._fb_dirty:
+            return
+        rows = sorted(self._fb_dirty)
+        self._fb_dirty.clear()
+        first = prev = rows[0]
+        for i in rows[1:] + [None]:
+            if i == prev+1:
+                prev = i
+                continue
+            # send lines first..prev
+            if self.pixels == 1:
+                data = tuple(tuple(self._fb_rows[k])
+                             for k in range(first, prev+1))
+            else:
+                data = []
+                for k in range(first, prev+1):
+                    line = tuple(c for c in self._fb_rows[k]
+                                 for _ in range(self.pixels))
+                    data.extend([line]*self.pixels)
+                data = tuple(data)
+            self._fb.put(data, to=(0, first*self.pixels))
+            first = prev = i
+
+    def _fb_span(self, y, x_1, x_2, color):
+        """Internal: color the pixels x_1 <= x < x_2 of the row y."""
+        x_1, x_2 = max(x_1, 0), min(x_2, self.size[1])
+        if 0 <= y < self.size[0] and x_1 < x_2:
+            self._fb_rows[y][x_1:x_2] = [color]*(x_2-x_1)
+            self._fb_dirty.add(y)
+
+    def _fb_line(self, x_1, x_2, color, thickness):
+        """Internal: draw a line in the framebuffer (Bresenham)."""
+        y_1, x_1, y_2, x_2 = int(x_1[0]), int(x_1[1]), int(x_2[0]), \
+            int(x_2[1])
+        height, width = self.size
+        if thickness <= 1:
+            rows = self._fb_rows
+            for x, y in raster.line_points(x_1, y_1, x_2, y_2):
+                if 0 <= y < height and 0 <= x < width:
+                    rows[y][x] = color
+            self._fb_dirty.update(range(max(min(y_1, y_2), 0),
+                                        min(max(y_1, y_2)+1, height)))
+            return
+        half = thickness//2
+        for x, y in raster.line_points(x_1, y_1, x_2, y_2):
+            for k in range(y-half, y-half+thickness):
+                self._fb_span(k, x-half, x-half+thickness, color)
 
     # pylint: disable=invalid-name
     # I'm too lazy to write 'remove'.
@@ -604,10 +1720,15 @@ class Screen(tk.Canvas):
     ):
         """Delete a graphical object.
 
+        With a piece pool, a deleted piece is only hidden, and its ID may be
+        returned again by draw_piece: don't use the IDs of deleted objects.
+
         Args:
             obj (int): an object ID (returned by an object creation method)
             refresh (bool, optional): refresh the window after drawing
-                (default: True)
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
 
         Returns:
             None
@@ -615,17 +1736,608 @@ class Screen(tk.Canvas):
         if not self.root:
             raise InterruptedError("window killed")
 
-        self.delete(obj)
+        if obj in self._pool:
+            # already deleted (and parked)
+            return
+        if self._model is not None and obj in self._model:
+            self._view_remove(obj)
+        elif obj in self._piece_pos and len(self._pool) < self._pool_size:
+            # keep it hidden for draw_piece
+            self.itemconfig(obj, state=tk.HIDDEN)
+            self._pool[obj] = None
+            self._layer_remove(obj, dtag=True)
+        else:
+            self.delete(obj)
+            self._layer_remove(obj)
+        self._forget_board(obj)
+        self._index(self._tiles, self._tile_pos, obj)
+        self._index(self._piece_cells, self._piece_pos, obj)
         if refresh:
-            self.update()
+            self._auto_refresh()
+
+    def blit(
+        self, array, palette=None, origin=(0, 0), refresh=True
+    ):
+        """Fill a whole rectangle of tiles at once, from a 2D array of colors.
+
+        The array is either a 2D array of integers, indices in the palette, or
+        an array of (red, green, blue) values between 0 and 255, such as a
+        HxWx3 numpy array of uint8. It may be a list of lists, or a numpy array
+        (faster, if numpy is installed). Lists may also contain color strings.
+
+        In framebuffer mode, the whole rectangle is sent to the window in a
+        single call.
+
+        Args:
+            array (2D array): the colors of the tiles, array[0][0] is the
+                color of the tile in position origin
+            palette (list of str, optional): the colors corresponding to the
+                integers of the array, color strings or handles returned by
+                color() (default: DEFAULT_COLOR). A None color, or a None
+                value in a list of lists, leaves the tile as is.
+            origin ([int, int], optional): grid position (line, column) of the
+                top-left corner of the rectangle (default: (0, 0)), it may be
+                outside the window: the tiles outside the window are ignored
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+
+        Returns:
+            list of int: the IDs of the colored tiles (empty in framebuffer
+                mode).
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        rows = self._blit_colors(array, palette)
+        # clip the rectangle to the window
+        i, j = origin
+        rows = [line[max(-j, 0):max(self.size[1]-j, 0)]
+                for line in rows[max(-i, 0):max(self.size[0]-i, 0)]]
+        i, j = max(i, 0), max(j, 0)
+        width = len(rows[0]) if rows else 0
+
+        lobj = []
+        if self._fb is not None:
+            for k, line in enumerate(rows):
+                fb_line = self._fb_rows[i+k]
+                if None in line:
+                    for col, color in enumerate(line, j):
+                        if color is not None:
+                            fb_line[col] = color
+                else:
+                    fb_line[j:j+width] = line
+                self._fb_dirty.add(i+k)
+        else:
+            for k, line in enumerate(rows):
+                for col, color in enumerate(line, j):
+                    if color is not None:
+                        lobj.append(self.draw_tile((i+k, col), color,
+                                                   refresh=False))
+        if refresh:
+            self._auto_refresh()
+        return lobj
+
+    def _blit_colors(self, array, palette):
+        """Internal: convert the array given to blit() to lists of colors.
+
+        The colors of the players (default palette) are only resolved if
+        they're used.
+        """
+        if palette is None:
+            lookup = self._player_color
+        else:
+            palette = [self._resolve(c) for c in palette]
+            lookup = palette.__getitem__
+        if numpy is not None and isinstance(array, numpy.ndarray):
+            if array.ndim == 3 and array.shape[2] == 3:
+                rgb = array.astype(numpy.uint32)
+                rgb = (rgb[:, :, 0] << 16) | (rgb[:, :, 1] << 8) | rgb[:, :, 2]
+                return numpy.char.mod("#%06x", rgb).tolist()
+            if array.ndim == 2:
+                if palette is None:
+                    palette = [lookup(k)
+                               for k in range(len(self.DEFAULT_COLOR))]
+                return numpy.array(palette, dtype=object)[array].tolist()
+            raise ValueError("blit: expecting a 2D or HxWx3 array!")
+        rows = []
+        for line in array:
+            colors = []
+            for value in line:
+                if value is None:
+                    colors.append(None)
+                elif isinstance(value, int):
+                    colors.append(lookup(value))
+                elif isinstance(value, str):
+                    colors.append(self._resolve(value))
+                else:
+                    red, green, blue = value
+                    colors.append(f"#{red:02x}{green:02x}{blue:02x}")
+            rows.append(colors)
+        return rows
+
+    ###########################################################################
+    # layers                                                                  #
+    ###########################################################################
+    _LAYER_TAG = "tkdraw_layer_"
+    # the new objects of a non-empty layer, before they go on top of it
+    _NEW_TAG = "tkdraw_new"
+
+    def show_layer(self, layer, refresh=True):
+        """Show all objects of a layer.
+
+        A layer is a named group of objects, drawn with the layer=name
+        argument of the drawing functions. The operations on a layer (show,
+        hide, clear, move, raise and lower) are done at once on all of its
+        objects, by a single tk call: the background, the board, the pieces
+        and the texts can be updated independently at a constant cost. A new
+        object of a layer is drawn on top of its layer, hidden if the layer
+        is hidden. In pixel mode, the objects of a layer are not drawn in the
+        window image.
+
+        Args:
+            layer (str): name of the layer
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+
+        Returns:
+            None
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        self._hidden_layers.discard(layer)
+        self.itemconfig(self._LAYER_TAG+layer, state=tk.NORMAL)
+        if refresh:
+            self._auto_refresh()
+
+    def hide_layer(self, layer, refresh=True):
+        """Hide all objects of a layer, see show_layer().
+
+        Args:
+            layer (str): name of the layer
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+
+        Returns:
+            None
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        self._hidden_layers.add(layer)
+        self.itemconfig(self._LAYER_TAG+layer, state=tk.HIDDEN)
+        if refresh:
+            self._auto_refresh()
+
+    def clear_layer(self, layer, refresh=True):
+        """Delete all objects of a layer, see show_layer().
+
+        Args:
+            layer (str): name of the layer
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+
+        Returns:
+            None
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        self.delete(self._LAYER_TAG+layer)
+        for obj in self._layers.pop(layer, ()):
+            del self._layer_of[obj]
+            self._forget_board(obj)
+            self._index(self._tiles, self._tile_pos, obj)
+            self._index(self._piece_cells, self._piece_pos, obj)
+        if refresh:
+            self._auto_refresh()
+
+    def move_layer(self, layer, delta, refresh=True):
+        """Move all objects of a layer by an offset, see show_layer().
+
+        The grid positions of the tiles and pieces are not changed (see
+        tile_at and piece_at).
+
+        Args:
+            layer (str): name of the layer
+            delta ([int, int]): pixel-wise offset (lines, columns)
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+
+        Returns:
+            None
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        self.move(self._LAYER_TAG+layer, delta[1], delta[0])
+        if refresh:
+            self._auto_refresh()
+
+    def raise_layer(self, layer, above=None, refresh=True):
+        """Send a layer to the foreground, see show_layer().
+
+        Args:
+            layer (str): name of the layer
+            above (str, optional): the layer after which to show up (default:
+                all objects, also if this layer is empty)
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+
+        Returns:
+            None
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        if self._layers.get(above):
+            self.tag_raise(self._LAYER_TAG+layer, self._LAYER_TAG+above)
+        else:
+            self.tag_raise(self._LAYER_TAG+layer)
+        if refresh:
+            self._auto_refresh()
+
+    def lower_layer(self, layer, below=None, refresh=True):
+        """Send a layer to the background, see show_layer().
+
+        Args:
+            layer (str): name of the layer
+            below (str, optional): the layer behind which to hide (default:
+                all objects, also if this layer is empty)
+            refresh (bool, optional): refresh the window after drawing
+                (default: True), at most refresh_rate times per second: the
+                last drawings may be shown later (see `Screen`, refresh_rate=0
+                to refresh at each drawing)
+
+        Returns:
+            None
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        if self._layers.get(below):
+            self.tag_lower(self._LAYER_TAG+layer, self._LAYER_TAG+below)
+        else:
+            self.tag_lower(self._LAYER_TAG+layer)
+        if refresh:
+            self._auto_refresh()
+
+    def _layer_tags(self, layer):
+        """Internal: return the tags of a new object of this layer.
+
+        The first object of a layer just gets the tag of the layer, the next
+        ones are put on top of it by _layer_add().
+        """
+        if layer is None:
+            return ()
+        if self._layers.get(layer):
+            return (self._NEW_TAG,)
+        return (self._LAYER_TAG+layer,)
+
+    def _layer_add(self, objs, layer):
+        """Internal: add new objects, tagged by _layer_tags(), to a layer."""
+        if layer is None:
+            return
+        tag = self._LAYER_TAG+layer
+        members = self._layers.setdefault(layer, set())
+        hidden = layer in self._hidden_layers
+        if members and not self.type(tag):
+            # only deleted objects left (a single object is enough to check,
+            # not the whole layer): the new ones start the layer again
+            for obj in members:
+                self._layer_of.pop(obj, None)
+            members.clear()
+            self.addtag_withtag(tag, self._NEW_TAG)
+            self.dtag(self._NEW_TAG, self._NEW_TAG)
+        if members:
+            # just above the top object of the layer
+            self.tag_raise(self._NEW_TAG, tag)
+            if hidden:
+                # only the new objects, not the whole layer again
+                self.itemconfig(self._NEW_TAG, state=tk.HIDDEN)
+            self.addtag_withtag(tag, self._NEW_TAG)
+            self.dtag(self._NEW_TAG, self._NEW_TAG)
+        elif hidden:
+            # the layer is just the new objects
+            self.itemconfig(tag, state=tk.HIDDEN)
+        members.update(objs)
+        for obj in objs:
+            self._layer_of[obj] = layer
+
+    def _layer_move(self, obj, layer):
+        """Internal: put an existing object on top of another layer."""
+        if self._layer_of.get(obj) != layer:
+            self._layer_remove(obj, dtag=True)
+            for tag in self._layer_tags(layer):
+                self.addtag_withtag(tag, obj)
+            self._layer_add((obj,), layer)
+
+    def _layer_remove(self, obj, dtag=False):
+        """Internal: remove an object from its layer, if any.
+
+        With dtag, the object keeps existing (a piece in the pool): its tag is
+        removed too.
+        """
+        layer = self._layer_of.pop(obj, None)
+        if layer is not None:
+            self._layers[layer].discard(obj)
+            if dtag:
+                self.dtag(obj, self._LAYER_TAG+layer)
+
+    ###########################################################################
+    # grid index                                                              #
+    ###########################################################################
+    def tile_at(self, pos):
+        """Return the tile in grid position pos=(line, column).
+
+        If several tiles were drawn there, this is the last one drawn or moved
+        to this position, among those still there. There is no tile in
+        framebuffer mode.
+
+        Args:
+            pos ([int, int]): grid position (line, column)
+
+        Returns:
+            int: the ID of the tile at this position, or None if there is none
+        """
+        i, j = pos
+        if not (0 <= i < self.size[0] and 0 <= j < self.size[1]):
+            raise ValueError("trying to look outside the window!")
+        return self._top(self._tiles, i*self.size[1]+j)
+
+    def piece_at(self, pos):
+        """Return the piece in grid position pos=(line, column).
+
+        If several pieces were drawn there, this is the last one drawn or
+        moved to this position, among those still there. A click event gives
+        a grid position, so this tells directly which piece was clicked:
+            ```
+            evt = g.wait_event()
+            if evt[0] == "click" and g.piece_at(evt[1]) is not None:
+                g.rm(g.piece_at(evt[1]))
+            ```
+        Args:
+            pos ([int, int]): grid position (line, column)
+
+        Returns:
+            int: the ID of the piece at this position, or None if there is
+                none
+        """
+        i, j = pos
+        if not (0 <= i < self.size[0] and 0 <= j < self.size[1]):
+            raise ValueError("trying to look outside the window!")
+        return self._top(self._piece_cells, i*self.size[1]+j)
+
+    def pieces_in(self, x_1, x_2):
+        """Return the pieces in the rectangle of grid positions x_1 to x_2.
+
+        Args:
+            x_1 ([int, int]): grid position (line, column) of the top-left
+                corner of the rectangle
+            x_2 ([int, int]): grid position (line, column) of the bottom-right
+                corner, excluded. The rectangle is clipped to the window.
+
+        Returns:
+            list of int: the IDs of the pieces, line by line
+        """
+        width = self.size[1]
+        cols = range(max(x_1[1], 0), min(x_2[1], width))
+        found = (self._top(self._piece_cells, i*width+j)
+                 for i in range(max(x_1[0], 0), min(x_2[0], self.size[0]))
+                 for j in cols)
+        return [obj for obj in found if obj is not None]
+
+    @staticmethod
+    def _index(cells, positions, obj, k=None):
+        """Internal: put an object on top of position k of a grid index.
+
+        The object leaves its previous position, and the index if k is None:
+        the object it covered is then on top again.
+        """
+        old = positions.pop(obj, None)
+        if old is not None:
+            stack = cells[old]
+            if stack[-1] == obj:
+                stack.pop()
+            else:
+                stack.remove(obj)
+            if not stack:
+                del cells[old]
+        if k is not None:
+            cells.setdefault(k, []).append(obj)
+            positions[obj] = k
+
+    @staticmethod
+    def _top(cells, k):
+        """Internal: return the top object of position k of a grid index."""
+        stack = cells.get(k)
+        return None if stack is None else stack[-1]
+
+    def _forget_index(self):
+        """Internal: empty the grid index once all objects were deleted."""
+        self._tiles.clear()
+        self._tile_pos.clear()
+        self._piece_cells.clear()
+        self._piece_pos.clear()
+
+    ###########################################################################
+    # viewport                                                                #
+    ###########################################################################
+    def scroll_to(self, pos, refresh=True):
+        """Scroll the board, to show it from grid position pos=(line, column).
+
+        Only useful if the window was opened with a `view` smaller than the
+        board. The view stays inside the board.
+
+        Args:
+            pos ([int, int]): grid position (line, column) of the tile to
+                show at the top-left corner of the window
+            refresh (bool, optional): refresh the window after scrolling
+                (default: True), at most refresh_rate times per second (see
+                `Screen`)
+
+        Returns:
+            (int, int): the grid position of the top-left visible tile
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+
+        self._origin = (min(max(pos[0], 0), self.size[0]-self._view[0]),
+                        min(max(pos[1], 0), self.size[1]-self._view[1]))
+        if self._model is not None:
+            for i in range(self._view[0]):
+                k = (self._origin[0]+i)*self.size[1]+self._origin[1]
+                for j in range(self._view[1]):
+                    self._show_slot(i*self._view[1]+j, k+j)
+        if refresh:
+            self._auto_refresh()
+        return self._origin
+
+    def scroll(self, delta, refresh=True):
+        """Scroll the board by delta=(lines, columns).
+
+        Args:
+            delta ([int, int]): number of lines and columns to scroll, the
+                board moves up and left if they are positive
+            refresh (bool, optional): refresh the window after scrolling
+                (default: True), at most refresh_rate times per second (see
+                `Screen`)
+
+        Returns:
+            (int, int): the grid position of the top-left visible tile
+        """
+        return self.scroll_to((self._origin[0]+delta[0],
+                               self._origin[1]+delta[1]), refresh)
+
+    def _create_slots(self):
+        """Internal: create the hidden objects showing the visible tiles.
+
+        One tile and one piece per visible position, all tiles below all
+        pieces.
+        """
+        bord = self.pixels//10+1
+        tiles = [self.create_rectangle(j*self.pixels+1+self._gap,
+                                       i*self.pixels+1+self._gap,
+                                       (j+1)*self.pixels+1,
+                                       (i+1)*self.pixels+1,
+                                       state=tk.HIDDEN)
+                 for i in range(self._view[0]) for j in range(self._view[1])]
+        pieces = [self.create_oval(j*self.pixels+bord+1,
+                                   i*self.pixels+bord+1,
+                                   (j+1)*self.pixels-bord+1,
+                                   (i+1)*self.pixels-bord+1,
+                                   width=1, state=tk.HIDDEN)
+                  for i in range(self._view[0]) for j in range(self._view[1])]
+        # each slot: tile and piece objects, and what they show
+        self._slots = [[tile, piece, None, None]
+                       for tile, piece in zip(tiles, pieces)]
+
+    def _show_slot(self, slot, k):
+        """Internal: show the tile and piece of grid position k in a slot."""
+        slot = self._slots[slot]
+        tile = self._top(self._tiles, k)
+        tile = None if tile is None else self._model[tile]
+        if tile != slot[2]:
+            slot[2] = tile
+            if tile is None:
+                self.itemconfig(slot[0], state=tk.HIDDEN)
+            else:
+                self.itemconfig(slot[0], fill=tile[0], width=tile[1],
+                                state=tk.NORMAL)
+        piece = self._top(self._piece_cells, k)
+        piece = None if piece is None else self._model[piece]
+        if piece != slot[3]:
+            slot[3] = piece
+            if piece is None:
+                self.itemconfig(slot[1], state=tk.HIDDEN)
+            else:
+                self.itemconfig(slot[1], fill=piece, state=tk.NORMAL)
+
+    def _view_update(self, k):
+        """Internal: show grid position k again, if it's visible."""
+        i = k//self.size[1]-self._origin[0]
+        j = k % self.size[1]-self._origin[1]
+        if 0 <= i < self._view[0] and 0 <= j < self._view[1]:
+            self._show_slot(i*self._view[1]+j, k)
+
+    def _view_tile(self, k, value):
+        """Internal: set the tile of grid position k, (color, border).
+
+        Returns:
+            int: the ID of the tile, the one already there if any
+        """
+        obj = self._top(self._tiles, k)
+        if obj is None:
+            return self._view_new(self._tiles, self._tile_pos, k, value)
+        self._model[obj] = value
+        self._view_update(k)
+        return obj
+
+    def _view_new(self, cells, positions, k, value):
+        """Internal: add a tile or a piece to the model, in grid position k.
+
+        The tile or piece that was there is deleted.
+
+        Returns:
+            int: the ID of the new tile or piece (negative)
+        """
+        if k in cells:
+            self._view_remove(self._top(cells, k))
+        self._model_count -= 1
+        self._model[self._model_count] = value
+        self._index(cells, positions, self._model_count, k)
+        self._view_update(k)
+        return self._model_count
+
+    def _view_move(self, cells, positions, obj, k):
+        """Internal: move a tile or a piece of the model to grid position k.
+
+        The tile or piece that was there is deleted.
+        """
+        if obj not in positions:
+            raise ValueError(f"unknown object {obj!r}")
+        if self._top(cells, k) not in (None, obj):
+            self._view_remove(self._top(cells, k))
+        old = positions[obj]
+        self._index(cells, positions, obj, k)
+        self._view_update(old)
+        self._view_update(k)
+
+    def _view_remove(self, obj):
+        """Internal: delete a tile or a piece of the model."""
+        del self._model[obj]
+        self._forget_board(obj)
+        for cells, positions in [(self._tiles, self._tile_pos),
+                                 (self._piece_cells, self._piece_pos)]:
+            k = positions.get(obj)
+            if k is not None:
+                self._index(cells, positions, obj)
+                self._view_update(k)
 
     ###########################################################################
     # Main I/O function                                                       #
     ###########################################################################
+    # period of the wakeups while waiting for an event (ms), when the signals
+    # (Ctrl-C) can't wake tk up, see _catch_signals()
+    _WAKEUP = 100
+
     def wait_event(self, delay=None):
         """Wait for the user to interact with the window.
 
-        The tracked events are only keypress and mouse click (left button).
+        The tracked events are keypress, mouse click (left button), and mouse
+        motion when it is enabled (see enable_motion()).
 
         Args:
             delay (int, optional): waiting time in ms (default: wait forever)
@@ -650,6 +2362,11 @@ class Screen(tk.Canvas):
                     `'python3 -m tkdraw'` will print all occuring events in the
                     console
 
+            - `("motion", (line, column))`
+
+                if the mouse moved to another tile of the board, only after
+                    enable_motion()
+
             - `("END", None)`
 
                 if the user closes the window
@@ -658,38 +2375,519 @@ class Screen(tk.Canvas):
         def _delay_expire():
             self._eventq.put(None)
             self._idd = None
-            self.root.quit()
 
+        # private: wakes tk up periodically, does nothing else
+        def _wakeup():
+            nonlocal wakeup_id
+            wakeup_id = self.root.after(self._WAKEUP, _wakeup)
+
+        # show the last plotted pixels and drawings
+        if self._fb_dirty and self.root:
+            self._fb_flush()
+        self._flush_refresh()
         # trigger the timer
         self._idd = None
         if delay is not None:
             if not self.root:
                 raise InterruptedError("window killed")
             self._idd = self.root.after(delay, _delay_expire)
+        if self._sigpipe is None and self.root:
+            self._catch_signals()
+        wakeup_id = None
+        if not self._sigpipe and self._WAKEUP and self.root:
+            # no wakeup pipe: check the signals periodically
+            wakeup_id = self.root.after(self._WAKEUP, _wakeup)
+        self._waiting = True
+        try:
+            return self._event_loop()
+        finally:
+            self._waiting = False
+            if wakeup_id is not None and self.root is not None:
+                self.root.after_cancel(wakeup_id)
+            self._deliver_signals()
+
+    def _catch_signals(self):
+        """Internal: let a Ctrl-C (SIGINT) wake tk up while waiting.
+
+        Python only handles the signals when tk gives the control back: the
+        signals are written to a pipe watched by tk (signal.set_wakeup_fd),
+        and SIGINT is just queued while waiting, until _deliver_signals()
+        calls its handler, out of tk.
+
+        Done once, at the first wait, and undone by close(). Without the pipe
+        (another wakeup pipe: another window, asyncio..., or no file handlers
+        in tk on Windows), wait_event() wakes tk up every _WAKEUP ms instead.
+        SIGINT is not caught at all if it's not possible: not the main thread,
+        or no Python SIGINT handler.
+        """
+        self._sigpipe = ()
+        handler = signal.getsignal(signal.SIGINT)
+        if (not callable(handler)
+                or threading.current_thread() is not threading.main_thread()):
+            return
+        self._sigint = handler
+        signal.signal(signal.SIGINT, self._on_signal)
+        wakeup = os.pipe()
+        os.set_blocking(wakeup[1], False)
+        try:
+            self.root.tk.createfilehandler(
+                wakeup[0], tk.READABLE,
+                lambda fileno, mask: os.read(fileno, 512))
+        except (AttributeError, tk.TclError):
+            for fileno in wakeup:
+                os.close(fileno)
+            return
+        previous = signal.set_wakeup_fd(wakeup[1])
+        if previous != -1:
+            # already used by someone else
+            signal.set_wakeup_fd(previous)
+            self.root.tk.deletefilehandler(wakeup[0])
+            for fileno in wakeup:
+                os.close(fileno)
+            return
+        self._sigpipe = wakeup
+
+    def _on_signal(self, signum, frame):
+        """Internal: SIGINT handler, see _catch_signals()."""
+        if self._waiting:
+            self._signals.append((signum, frame))
+        else:
+            self._sigint(signum, frame)
+
+    def _deliver_signals(self):
+        """Internal: call the handler of the signals caught while waiting."""
+        while self._signals:
+            self._sigint(*self._signals.pop(0))
+
+    def _release_signals(self):
+        """Internal: stop catching the signals, see _catch_signals()."""
+        in_main = threading.current_thread() is threading.main_thread()
+        # unless another handler or pipe replaced them since (a new bound
+        # method at each access: compared by ==, not by is)
+        # pylint: disable=comparison-with-callable
+        if in_main and signal.getsignal(signal.SIGINT) == self._on_signal:
+            signal.signal(signal.SIGINT, self._sigint)
+        if not self._sigpipe:
+            return
+        if in_main:
+            current = signal.set_wakeup_fd(-1)
+            if current != self._sigpipe[1]:
+                signal.set_wakeup_fd(current)
+        self.root.tk.deletefilehandler(self._sigpipe[0])
+        for fileno in self._sigpipe:
+            os.close(fileno)
+        self._sigpipe = ()
+
+    def _event_loop(self):
+        """Internal: handle the tk events until an event is queued."""
         # This is Tk's main loop
-        # checks the events and get out if something happens
+        # handles the events one by one and get out if something happens
         while True:
             ####################
+            # draw what the other threads asked for
+            if self._commands:
+                self._run_commands()
+                self._fb_flush()
+                self.update_idletasks()
             try:
                 # get something from the event queue
-                ret = self._eventq.get(False)
+                ret = self._eventq.get()
                 # cancels the timer if I got something
                 if self._idd is not None and self.root is not None:
                     self.root.after_cancel(self._idd)
                 return ret
             except queue.Empty:
-                # no event in the queue, continue waiting (go to mainloop)
+                # no event in the queue, continue waiting
                 pass
             ####################
             if not self.root:
                 raise InterruptedError("window killed")
-            # back to the mainloop, it will stop if I get an event
-            self.root.mainloop()
+            # sleep until tk has something to do (an event, a timer, a
+            # signal...), and do it
+            self.root.tk.dooneevent(0)
+            self._deliver_signals()
             ####################
 
+    ###########################################################################
+    # asyncio interface                                                       #
+    ###########################################################################
+    # shortest and longest pauses between two checks of the tk events (s)
+    _ASYNC_PAUSES = (0.001, 0.02)
+
+    async def next_event(self, timeout=None):
+        """Wait for the user to interact with the window, asyncio version.
+
+        Same as wait_event(), but it is a coroutine: other asyncio tasks run
+        while waiting. The tk events are handled from the asyncio event loop:
+        they are checked often while the user is active, and at most 50 times
+        per second when idle. The drawing methods can be called from any
+        coroutine, they don't block.
+
+        Example:
+            ```
+            async def main():
+                g = tkdraw.screen.Screen()
+                evt = await g.next_event()
+                while evt[0] != "END":
+                    ...
+                    evt = await g.next_event()
+            asyncio.run(main())
+            ```
+        Args:
+            timeout (float, optional): maximum waiting time in seconds
+                (default: wait forever)
+
+        Returns:
+            the event, as returned by wait_event(), or None if the timeout
+                expires.
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+        # show the last plotted pixels and drawings
+        self._fb_flush()
+        self._flush_refresh()
+        if timeout is not None:
+            timeout += time.perf_counter()
+        pause = self._ASYNC_PAUSES[0]
+        while True:
+            try:
+                return self._eventq.get()
+            except queue.Empty:
+                pass
+            if not self.root:
+                raise InterruptedError("window killed")
+            if self._pump():
+                # the user is active: check again soon
+                pause = self._ASYNC_PAUSES[0]
+                continue
+            if timeout is not None:
+                if time.perf_counter() >= timeout:
+                    return None
+                pause = min(pause, timeout-time.perf_counter())
+            await asyncio.sleep(max(pause, 0))
+            pause = min(2*pause, self._ASYNC_PAUSES[1])
+
+    async def events(self):
+        """Asynchronous iterator on the events, until the window is closed.
+
+        Example:
+            ```
+            async for evt in g.events():
+                print(evt)
+            ```
+        Yields:
+            the events, as returned by wait_event(), the last one is
+                `("END", None)`.
+        """
+        while True:
+            evt = await self.next_event()
+            yield evt
+            if evt[0] == "END":
+                return
+
+    ###########################################################################
+    # multi-threading                                                         #
+    ###########################################################################
+    def threadsafe(self):
+        """Return a proxy of this window, to draw from other threads.
+
+        Tk must be driven from a single thread: the one that opened the
+        window. The drawing methods of the proxy can be called from any other
+        thread, they don't draw anything themselves but queue the drawing
+        commands. The thread of the window does them in bulk, with a single
+        refresh, as soon as it waits for an event (wait_event) or refreshes
+        the window (refresh).
+
+        Example:
+            ```
+            def worker(proxy, line):
+                for j in range(8):
+                    proxy.draw_tile((line, j), "red")
+            proxy = g.threadsafe()
+            for i in range(8):
+                threading.Thread(target=worker, args=(proxy, i)).start()
+            ```
+        Returns:
+            ThreadSafeScreen: the proxy.
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+        self._start_waker()
+        return ThreadSafeScreen(self)
+
+    def _submit(self, name, args, kwargs):
+        """Internal: queue a command from another thread, return a Future."""
+        future = concurrent.futures.Future()
+        if threading.get_ident() == self._thread:
+            # the thread of the window: no need to wait
+            self._commands.append((future, name, args, kwargs))
+            self._run_commands()
+            return future
+        # the thread of the window refreshes once all commands are done
+        kwargs["refresh"] = False
+        with self._commands_lock:
+            if self._closed:
+                future.set_exception(InterruptedError("window killed"))
+                return future
+            self._commands.append((future, name, args, kwargs))
+            if not self._woken and self._waker is not None:
+                # wake the thread of the window up, if it's waiting
+                self._woken = True
+                os.write(self._waker[1], b"!")
+        return future
+
+    def _run_commands(self):
+        """Internal: do the commands queued by other threads.
+
+        Once the window is closed, the commands fail (InterruptedError).
+        They are called by the program, not by the method running them
+        (refresh, wait_event...): they are observed as top-level calls.
+        """
+        def _value(arg):
+            if isinstance(arg, concurrent.futures.Future):
+                return arg.result()
+            return arg
+
+        # pylint: disable=broad-exception-caught
+        # the exceptions are given to the calling threads.
+        depth, self._depth = self._depth, 0
+        try:
+            while self._commands:
+                future, name, args, kwargs = self._commands.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    # the IDs returned by previous commands can be used as
+                    # arguments
+                    args = [_value(a) for a in args]
+                    kwargs = {k: _value(v) for k, v in kwargs.items()}
+                    future.set_result(getattr(self, name)(*args, **kwargs))
+                except Exception as exc:
+                    future.set_exception(exc)
+        finally:
+            self._depth = depth
+
+    def _start_waker(self):
+        """Internal: wake the window up when other threads send commands.
+
+        Uses a pipe watched by tk, or checks 100 times per second if tk can't
+        watch files (on Windows).
+        """
+        # pylint: disable=unused-argument
+        # tk's file handler arguments.
+        def _wake(fileno, mask):
+            # drain the pipe first: a command sent from now on wakes the
+            # window up again
+            os.read(fileno, 4096)
+            with self._commands_lock:
+                self._woken = False
+            self._run_commands()
+            self._fb_flush()
+            self.update_idletasks()
+
+        def _check():
+            self._waker_id = self.root.after(10, _check)
+            if self._commands:
+                self._run_commands()
+                self._fb_flush()
+
+        if self._waker is not None or self._waker_id is not None:
+            return
+        try:
+            self._waker = os.pipe()
+            self.root.tk.createfilehandler(self._waker[0], tk.READABLE, _wake)
+        except (AttributeError, tk.TclError):
+            for fileno in self._waker:
+                os.close(fileno)
+            self._waker = None
+            _check()
+
+    def _stop_waker(self):
+        """Internal: stop watching the commands of other threads."""
+        if self._waker_id is not None:
+            self.root.after_cancel(self._waker_id)
+            self._waker_id = None
+        if self._waker is not None:
+            self.root.tk.deletefilehandler(self._waker[0])
+            for fileno in self._waker:
+                os.close(fileno)
+            self._waker = None
+
+    def _pump(self):
+        """Internal: handle all pending tk events, never waits.
+
+        Returns:
+            int: the number of handled tk events
+        """
+        count = 0
+        while self.root and self.root.tk.dooneevent(_tkinter.DONT_WAIT):
+            count += 1
+        return count
+
+    def poll_events(self, max_n=None):
+        """Return all the pending events at once, without waiting.
+
+        Like wait_event(), the window is refreshed first. Then all pending
+        events are handled, and returned in a list. Good for a game loop
+        reading all the input of a frame in a single call.
+
+        Args:
+            max_n (int, optional): maximum number of events returned, the next
+                ones stay in the queue (default: None, all of them)
+
+        Returns:
+            list: the events (possibly none), oldest first, as returned by
+                wait_event()
+        """
+        if self.root:
+            self._run_commands()
+            self._fb_flush()
+            self._flush_refresh()
+        return self._pending_events(max_n)
+
+    def _pending_events(self, max_n=None):
+        """Internal: handle all pending tk events, return the queued events.
+
+        Never waits.
+        """
+        if self.root:
+            self._pump()
+        elif not self._eventq:
+            raise InterruptedError("window killed")
+        events = []
+        while max_n is None or len(events) < max_n:
+            try:
+                events.append(self._eventq.get())
+            except queue.Empty:
+                break
+        return events
+
+    def limit_events(self, capacity=64, policy="drop-oldest"):
+        """Bound the queue of the events not read yet.
+
+        The queue is unbounded by default: a program slower than the events
+        (a held-down key for example) lags more and more behind the user.
+        With a capacity, the oldest event is dropped when the queue is full.
+        With the "coalesce" policy, a key event repeating the last queued
+        event is dropped too, and a motion event replaces the last queued
+        event if it's a motion. The END event and the expired delays of
+        wait_event() are never dropped. The numbers of dropped and coalesced
+        events are given by stats().
+
+        Args:
+            capacity (int, optional): maximum number of events in the queue,
+                None for no limit (default: 64)
+            policy (str, optional): "drop-oldest" or "coalesce" (default:
+                "drop-oldest")
+
+        Returns:
+            None
+        """
+        if policy not in ("drop-oldest", "coalesce"):
+            raise ValueError(f"unknown event policy \"{policy}\"")
+        if capacity is not None and capacity < 1:
+            raise ValueError("the capacity must be positive")
+        self._eventq.capacity = capacity
+        self._eventq.policy = policy
+
+    # pylint: disable=too-many-arguments
+    # self doesn't count, and 4 are optional
+    def run(
+        self, update, render=None, fps=60, max_skip=5, max_frames=None
+    ):
+        """Run a game loop at a fixed frame rate.
+
+        For each frame, `update(events)` is called with the list of all the
+        events that arrived during the frame (possibly empty), then `render()`
+        is called and the window is refreshed.
+        Frames are scheduled at fixed times (start + n/fps): the time spent in
+        update and render does not make the frame rate drift. When the loop is
+        late by more than a frame, render is skipped (the frame is dropped) to
+        catch up, but no more than max_skip frames in a row.
+
+        The loop stops when update returns False, or when the window is closed
+        (update is called a last time with the `("END", None)` event).
+
+        Example:
+            ```
+            def update(events):
+                for evt in events:
+                    ...  # react to the events
+                ...  # move things (refresh=False)
+            g.run(update, fps=30)
+            ```
+        Args:
+            update (function): called with the list of events of each frame
+            render (function, optional): called after update to draw the
+                frame, unless it is dropped (default: None, nothing to call)
+            fps (int, optional): frames per second (default: 60)
+            max_skip (int, optional): maximum number of frames dropped in a
+                row (default: 5)
+            max_frames (int, optional): stop after this number of frames
+                (default: None, run forever)
+
+        Returns:
+            dict: statistics of the loop, "frames" (number of calls to update),
+                "rendered" and "dropped" frames, "time" (seconds) and the
+                achieved "fps" (rendered frames per second).
+        """
+        if not self.root:
+            raise InterruptedError("window killed")
+        period = 1/fps
+        start = deadline = time.perf_counter()
+        stats = {"frames": 0, "rendered": 0, "dropped": 0}
+        skipped = 0
+        while max_frames is None or stats["frames"] < max_frames:
+            deadline += period
+            events = self._frame_events(deadline)
+            stats["frames"] += 1
+            if update(events) is False or ("END", None) in events:
+                break
+            late = time.perf_counter()-deadline > period
+            if late and skipped < max_skip:
+                # late: skip this frame
+                stats["dropped"] += 1
+                skipped += 1
+                continue
+            if late:
+                # too late to catch up: start a new schedule from now
+                deadline = time.perf_counter()
+            skipped = 0
+            if render is not None:
+                render()
+            self.refresh()
+            stats["rendered"] += 1
+        stats["time"] = time.perf_counter()-start
+        stats["fps"] = (stats["rendered"]/stats["time"] if stats["time"]
+                        else 0.0)
+        return stats
+
+    def _frame_events(self, deadline):
+        """Internal: collect the events of a frame of run(), until deadline.
+
+        The deadline is a time.perf_counter() time. Stops at the END event.
+        """
+        events = []
+        while True:
+            remaining = int((deadline-time.perf_counter())*1000)
+            if remaining <= 0:
+                # no time left: only the events that already arrived
+                events.extend(self._pending_events())
+                return events
+            evt = self.wait_event(remaining)
+            if evt is None:
+                return events
+            events.append(evt)
+            if evt == ("END", None):
+                return events
+
     def mouse_position(self):
         """Return the mouse position (pixel-wise).
 
+        The position is tracked by the window, reading it costs nothing: it's
+        the position given by the last motion event handled by the window
+        (when it refreshes or waits for an event).
+
         Note:
             The returned coordinates can be negative or greater than the window
                 size, when the mouse is out of the window but the window still
@@ -702,18 +2900,160 @@ class Screen(tk.Canvas):
             a couple ([int, int]): pixel-wise position (line, column) relative
         to (0,0) = top-left position in the window.
         """
-        # private: the mouse moved
-        def _motion(event):
-            self._souris = (event.y, event.x)
+        if not self.root:
+            raise InterruptedError("window killed")
+        return self._souris
 
+    def enable_motion(self, enable=True, rate=30):
+        """Report the moves of the mouse as events.
+
+        When enabled, wait_event() (and the other event functions) also
+        return `("motion", (line, column))` events, when the mouse moves to
+        another tile of the board. The moves are coalesced: at most rate
+        events are sent per second, the last one giving the last tile reached
+        by the mouse.
+
+        Args:
+            enable (bool, optional): enable or disable (default: True)
+            rate (int, optional): maximum number of motion events per second
+                (default: 30)
+
+        Returns:
+            None
+        """
         if not self.root:
             raise InterruptedError("window killed")
-        self.refresh()
+        if rate <= 0:
+            raise ValueError("the rate must be positive")
+        self._motion_rate = rate if enable else 0
+        self._motion_cell = None
+        if self._motion_id is not None:
+            self.root.after_cancel(self._motion_id)
+            self._motion_id = None
+
+    def _post_motion(self):
+        """Internal: send a motion event if the mouse moved to another tile.
+
+        Then the next moves are only coalesced, until the timer ends.
+        """
+        self._motion_id = None
+        if not self._motion_rate or not self.root:
+            return
+        cell = self._cell(*self._souris)
+        if cell is None or cell == self._motion_cell:
+            return
+        self._motion_cell = cell
+        self._eventq.put(("motion", cell))
+        self._motion_id = self.root.after(max(1000//self._motion_rate, 1),
+                                          self._post_motion)
+
+    def _cell(self, y, x):
+        """Internal: return the board position of a canvas pixel, or None.
+
+        The position is None if the pixel is not in the board.
+        """
+        if not (1 <= y <= self._view[0]*self.pixels+self._gap
+                and 1 <= x <= self._view[1]*self.pixels+self._gap):
+            return None
+        # the last pixel (grid line) is in the last tile
+        i = min((y-1)//self.pixels, self._view[0]-1)
+        j = min((x-1)//self.pixels, self._view[1]-1)
+        return (i+self._origin[0], j+self._origin[1])
+
+
+class ThreadSafeScreen:
+    """Proxy of a window, to draw in it from any thread.
+
+    Created by `Screen.threadsafe()`. The following methods of the window are
+    available: draw_piece, move_piece, draw_tile, move_tile, draw_line,
+    draw_lines, draw_circle, draw_rectangle, draw_text, update_text, blit, bg,
+    fg, rm and the layer methods (show_layer, hide_layer, clear_layer,
+    move_layer, raise_layer and lower_layer). They take the same arguments,
+    but they return a `concurrent.futures.Future` of the result (the ID of the
+    created object for example), available once the command is done by the
+    thread of the window. Such a future can directly be given as an object ID
+    to the next commands.
+    """
+
+    # pylint: disable=too-few-public-methods
+    # all methods are the ones of the window.
+    METHODS = ("draw_piece", "move_piece", "draw_tile", "move_tile",
+               "draw_line", "draw_lines", "draw_circle", "draw_rectangle",
+               "draw_text", "update_text", "blit", "bg", "fg", "rm",
+               "show_layer", "hide_layer", "clear_layer", "move_layer",
+               "raise_layer", "lower_layer")
+    """The available methods."""
+
+    def __init__(self, screen):
+        self._screen = screen
+
+    def __getattr__(self, name):
+        """Internal: the methods queue a command to the window."""
+        if name not in self.METHODS:
+            raise AttributeError(
+                f"{name} is not available from other threads")
+
+        def command(*args, **kwargs):
+            # pylint: disable=protected-access
+            # the proxy is a part of the window.
+            return self._screen._submit(name, args, kwargs)
+        return command
+
+
+class _EventQueue:
+    """Internal: the queue of the events of a window, possibly bounded.
+
+    Same interface as queue.Queue, without the locks: the events are only put
+    and got by the thread of the window. See `Screen.limit_events`.
+    """
+
+    def __init__(self):
+        self.capacity = None
+        self.policy = "drop-oldest"
+        self.dropped = 0
+        self.coalesced = 0
+        self._events = collections.deque()
+
+    def __len__(self):
+        return len(self._events)
+
+    def put(self, evt):
+        """Add an event, coalescing or dropping events if needed."""
+        if self.policy == "coalesce" and self._events \
+                and self._droppable(evt):
+            last = self._events[-1]
+            if evt[0] == "key" and last == evt:
+                # a repeated key
+                self.coalesced += 1
+                return
+            if evt[0] == "motion" and self._droppable(last) \
+                    and last[0] == "motion":
+                self._events[-1] = evt
+                self.coalesced += 1
+                return
+        if self.capacity is not None and len(self._events) >= self.capacity:
+            for k, old in enumerate(self._events):
+                if self._droppable(old):
+                    del self._events[k]
+                    self.dropped += 1
+                    break
+        self._events.append(evt)
+
+    def get(self):
+        """Remove and return the oldest event, never waits.
+
+        Raises:
+            queue.Empty: if there is no event
+        """
         try:
-            return self._souris
-        except AttributeError:
-            self.bind("<Motion>", _motion)
-            return self._souris
+            return self._events.popleft()
+        except IndexError:
+            raise queue.Empty from None
+
+    @staticmethod
+    def _droppable(evt):
+        """Internal: the user events can be dropped, not END nor timers."""
+        return isinstance(evt, tuple) and evt[0] != "END"
 
 
 ###########################################################################
@@ -737,14 +3077,12 @@ if __name__ == "__main__":
         # refresh only once for performance
         win.refresh()
 
-        # welcome message
+        # welcome message, then the player to play
         msg = win.draw_text((PIXEL_SIZE//2, PIXEL_SIZE+PIXEL_SIZE//2),
                           "Hello!\nclick here ->")
 
         # main loop: wait for user clicks and draw pieces.
-        # tab = 2D grid containing the graphical object IDs
         # if you click again on a piece it will be deleted, same player plays
-        tab = [[None]*SIZE for i in range(SIZE)]
         player = 1  # white player starts, black = -1.
         while True:
             evt = win.wait_event()
@@ -762,22 +3100,19 @@ if __name__ == "__main__":
             if evt[0] != "click":
                 continue
 
-            lig, col = evt[1]
-            if tab[lig][col] is None:
-                tab[lig][col] = win.draw_piece(evt[1], player)
+            # the window knows which piece is at each position
+            obj = win.piece_at(evt[1])
+            if obj is None:
+                win.draw_piece(evt[1], player)
                 # player : 1 -> -1 -> 1 -> ...
                 player = -player
             else:
-                # remove the piece at position (lig, col)
-                win.rm(tab[lig][col])
-                tab[lig][col] = None
+                # remove the piece at the clicked position
+                win.rm(obj)
                 # and same player plays again
 
-            # remove the previous message
-            win.rm(msg, refresh=False)
-            # and put a new one
-            msg = win.draw_text((PIXEL_SIZE//2, PIXEL_SIZE+PIXEL_SIZE//2),
-                              [0, "white player", "black player"][player])
+            # change the message
+            win.update_text(msg, [0, "white player", "black player"][player])
 
         # at the end, close the window properly
         win.close()
@@ -3,3 +3,39 @@ tkdraw.test.test_screen.test_screen()
 
 import tkdraw.test.test_basic
 tkdraw.test.test_basic.test_basic()
+tkdraw.test.test_basic.test_offscreen_plot_parallel()
+
+import tkdraw.test.test_offscreen
+tkdraw.test.test_offscreen.test_offscreen()
+tkdraw.test.test_offscreen.test_offscreen_pixels()
+tkdraw.test.test_offscreen.test_offscreen_run()
+tkdraw.test.test_offscreen.test_offscreen_asyncio()
+tkdraw.test.test_offscreen.test_offscreen_pool()
+tkdraw.test.test_offscreen.test_offscreen_index()
+tkdraw.test.test_offscreen.test_offscreen_refresh()
+tkdraw.test.test_offscreen.test_offscreen_text()
+tkdraw.test.test_offscreen.test_offscreen_grid()
+tkdraw.test.test_offscreen.test_offscreen_draw_grid()
+tkdraw.test.test_offscreen.test_offscreen_view()
+tkdraw.test.test_offscreen.test_offscreen_motion()
+tkdraw.test.test_offscreen.test_offscreen_events()
+tkdraw.test.test_offscreen.test_offscreen_fb_draw()
+tkdraw.test.test_offscreen.test_offscreen_layers()
+tkdraw.test.test_offscreen.test_offscreen_layers_deleted()
+tkdraw.test.test_offscreen.test_offscreen_threadsafe()
+tkdraw.test.test_offscreen.test_offscreen_threadsafe_pixels()
+tkdraw.test.test_offscreen.test_offscreen_signals()
+tkdraw.test.test_offscreen.test_offscreen_wakeup()
+tkdraw.test.test_offscreen.test_offscreen_tile_cache()
+tkdraw.test.test_offscreen.test_offscreen_blit()
+
+import tkdraw.test.test_bench
+tkdraw.test.test_bench.test_bench()
+
+import tkdraw.test.test_record
+tkdraw.test.test_record.test_record()
+tkdraw.test.test_record.test_record_threadsafe()
+
+import tkdraw.test.test_capture
+tkdraw.test.test_capture.test_capture()
+tkdraw.test.test_capture.test_capture_drop()
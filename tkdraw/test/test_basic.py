@@ -1,4 +1,7 @@
 """Test the tkdraw.basic module."""
+import os
+from multiprocessing import shared_memory
+
 import tkdraw.basic as graph
 
 HEIGHT = 200
@@ -16,3 +19,53 @@ def test_basic():
         graph.refresh()
 
     graph.wait()
+
+
+def _color(line, column):
+    """The color of a pixel, for plot_parallel."""
+    return (line*8 % 256, column*8 % 256, 128)
+
+
+def test_offscreen_plot_parallel():
+    """Compare plot_parallel with plot, in an offscreen window."""
+    # pylint: disable=protected-access,no-member
+    # the image of the (offscreen) window and the shared memory are checked.
+    names = []
+
+    class SharedMemory(shared_memory.SharedMemory):
+        """Remembers the shared memory blocks that are created."""
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            names.append(self.name)
+
+    backend = os.environ.get("TKDRAW_BACKEND")
+    os.environ["TKDRAW_BACKEND"] = "offscreen"
+    shared_memory.SharedMemory = SharedMemory
+    try:
+        graph.open_win(20, 30)
+        graph.plot_parallel(_color, processes=2)
+        parallel = bytes(graph._WINDOW.image().data)
+        graph.wait()
+        graph.open_win(20, 30)
+        for i in range(20):
+            for j in range(30):
+                red, green, blue = _color(i, j)
+                graph.plot(i, j, f"#{red:02x}{green:02x}{blue:02x}")
+        graph.refresh()
+        serial = bytes(graph._WINDOW.image().data)
+        graph.wait()
+    finally:
+        shared_memory.SharedMemory = SharedMemory.__base__
+        if backend is None:
+            del os.environ["TKDRAW_BACKEND"]
+        else:
+            os.environ["TKDRAW_BACKEND"] = backend
+    assert parallel == serial
+    # the shared memory is released
+    assert names
+    for name in names:
+        try:
+            shared_memory.SharedMemory(name=name)
+            assert False, "the shared memory should be released"
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,18 @@
+"""Test the tkdraw.bench module (offscreen, no display needed)."""
+import tkdraw.bench
+
+
+def test_bench():
+    """Run small benchmarks, and compare them to a baseline."""
+    results = tkdraw.bench.run(["plot_fill", "text_churn", "click_latency"],
+                               backend="offscreen", repeat=1)
+    assert set(results) == {"plot_fill", "text_churn", "click_latency"}
+    assert all(value >= 0 for measures in results.values()
+               for value in measures.values())
+
+    baseline = {"plot_fill": {"plot_ms": 1.0, "refresh_ms": 1e9},
+                "text_churn": {"replace_us": -1.0}}
+    regressions = tkdraw.bench.compare(results, baseline)
+    assert [(name, key) for name, key, _, _ in regressions] \
+        == [("plot_fill", "plot_ms")]
+    assert tkdraw.bench.compare(results, results) == []
@@ -0,0 +1,63 @@
+"""Test the tkdraw.capture module (offscreen, no display needed)."""
+import io
+import os
+import tempfile
+import threading
+
+import tkdraw.capture
+import tkdraw.raster
+import tkdraw.screen
+
+
+def test_capture():
+    """Capture the frames of a window in files and in a stream."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pattern = os.path.join(tmp, "frame%02d.ppm")
+        g = tkdraw.screen.Screen((4, 4), 10, refresh_rate=0,
+                                 backend="offscreen")
+        g.start_capture(pattern, wait=True)
+        g.draw_tile((0, 0), "red")
+        g.draw_piece((1, 1), 0, refresh=False)
+        g.refresh()
+        assert g.stop_capture() == {"frames": 2, "dropped": 0}
+        assert sorted(os.listdir(tmp)) == ["frame00.ppm", "frame01.ppm"]
+        with open(os.path.join(tmp, "frame01.ppm"), "rb") as frame:
+            assert frame.read() == g.image().to_ppm()
+
+        # raw frames in a stream, one refresh out of 2
+        out = io.BytesIO()
+        g.start_capture(out, every_n_refreshes=2, fmt="raw", wait=True)
+        for k in range(4):
+            g.draw_tile((2, k), "blue")
+        assert g.stats()["capture"]["dropped"] == 0
+        assert g.stop_capture()["frames"] == 2
+        assert out.getvalue()[-len(g.image().data):] == g.image().data
+        assert len(out.getvalue()) == 2*len(g.image().data)
+        assert g.stats()["capture"] is None
+        g.close()
+
+
+def test_capture_drop():
+    """A dropped frame takes no snapshot."""
+    snapshots = []
+    writing = threading.Event()
+    blocked = threading.Event()
+
+    def frame():
+        writing.set()
+        blocked.wait()
+        return tkdraw.raster.Raster(2, 2)
+
+    def snapshot():
+        snapshots.append(frame)
+        return frame
+
+    capture = tkdraw.capture.Capture(io.BytesIO(), queue_size=1)
+    # the writer thread waits in the first frame, the second one is queued
+    capture.refreshed(snapshot)
+    writing.wait()
+    for _ in range(3):
+        capture.refreshed(snapshot)
+    assert capture.dropped == 2 and len(snapshots) == 2
+    blocked.set()
+    assert capture.close() == {"frames": 2, "dropped": 2}
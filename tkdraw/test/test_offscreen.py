@@ -0,0 +1,648 @@
+"""Test the tkdraw.offscreen module (no display needed)."""
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+import tkinter
+
+import tkdraw.offscreen
+import tkdraw.screen
+
+
+def test_offscreen():
+    """Draw in an offscreen window, check its pixels and scripted events."""
+    HEIGHT = 6
+    WIDTH = 8
+    TILE_SIZE = 10
+
+    g = tkdraw.screen.Screen((HEIGHT, WIDTH), TILE_SIZE, backend="offscreen",
+                             events=[("click", (2, 3)), ("key", "a"), None])
+
+    # grid lines, tiles and pieces
+    assert g.pixel((0, 0)) == (0, 0, 0)
+    g.draw_tile((1, 1), "red")
+    assert g.pixel((15, 15)) == (255, 0, 0)
+    obj = g.draw_piece((2, 2), color="blue")
+    assert g.pixel((25, 25)) == (0, 0, 255)
+    g.move_piece(obj, (3, 3))
+    assert g.pixel((25, 25)) != (0, 0, 255)
+    assert g.pixel((35, 35)) == (0, 0, 255)
+    g.rm(obj)
+    assert g.pixel((35, 35)) != (0, 0, 255)
+
+    # scripted events, then the window is closed
+    assert g.wait_event() == ("click", (2, 3))
+    assert g.wait_event() == ("key", "a")
+    assert g.wait_event(100) is None
+    assert g.wait_event() == ("END", None)
+    try:
+        g.draw_tile((0, 0))
+        assert False, "the window should be closed"
+    except InterruptedError:
+        pass
+
+
+def test_offscreen_pixels():
+    """Framebuffer pixel mode and PPM export of an offscreen window."""
+    g = tkdraw.screen.Screen((20, 30), 1, grid=False, backend="offscreen")
+    for i in range(20):
+        for j in range(30):
+            g.draw_tile((i, j), "green" if i < j else "#FF0000",
+                        refresh=False)
+    g.refresh()
+    # a single object: the image
+    assert len(g.find_all()) == 1
+    assert g.pixel((0, 1)) == (0, 255, 0)
+    assert g.pixel((1, 0)) == (255, 0, 0)
+    ppm = g.image().to_ppm()
+    assert ppm.startswith(b"P6\n30 20\n255\n")
+    assert len(ppm) == len(b"P6\n30 20\n255\n")+20*30*3
+    # RGB strings are converted without asking tk
+    calls = []
+    winfo_rgb = g.winfo_rgb
+    g.winfo_rgb = lambda color: calls.append(color) or winfo_rgb(color)
+    g.blit([["#00F", "#0000ff", "#0000FF"]])
+    assert calls == []
+    assert g.pixel((0, 0)) == g.pixel((0, 2)) == (0, 0, 255)
+    g.draw_tile((0, 0), "navy")
+    assert calls == ["navy"]
+    # handles are the window's own small integers
+    for handle in (True, -1, 1000):
+        try:
+            g.draw_tile((0, 0), handle)
+            assert False, "the handle should be refused"
+        except ValueError:
+            pass
+    # the colors of the players can be changed
+    g2 = tkdraw.screen.Screen((2, 2), 10, backend="offscreen")
+    g2.DEFAULT_COLOR = ["navy", "pink"]
+    g2.draw_piece((0, 0), 3)
+    assert g2.pixel((5, 5)) == (255, 192, 203)
+    g2.close()
+    # #rgb is #rrggbb, as for tk
+    assert g.winfo_rgb("#fa0") == (0xffff, 0xaaaa, 0)
+    # all the color names of tk, in any case, with or without spaces
+    assert g.winfo_rgb("SteelBlue") == (0x4646, 0x8282, 0xb4b4)
+    assert g.winfo_rgb("lightcoral") == g.winfo_rgb("Light Coral")
+    assert g.winfo_rgb("DarkSlateGrey4") == (0x5252, 0x8b8b, 0x8b8b)
+    assert g.winfo_rgb("gray50") == (0x7f7f,)*3
+    try:
+        g.winfo_rgb("SteelBlue5")
+        assert False, "the color should be unknown"
+    except tkinter.TclError:
+        pass
+    g.close()
+
+
+def test_offscreen_run():
+    """Game loop: events are given to update frame by frame."""
+    g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen",
+                             events=[("key", "a"), None, None,
+                                     ("click", (0, 0)), None])
+    frames = []
+    stats = g.run(frames.append, fps=10)
+    assert frames == [[("key", "a")], [], [("click", (0, 0))],
+                      [("END", None)]]
+    assert stats["frames"] == 4 and stats["rendered"] == 3
+
+    # without dropping frames, the schedule doesn't drift
+    g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen",
+                             events=[None]*4)
+    deadlines = []
+    frame_events = g._frame_events  # pylint: disable=protected-access
+    g._frame_events = lambda deadline: (deadlines.append(deadline)
+                                        or frame_events(deadline))
+    g.run(lambda events: time.sleep(0.005), fps=20, max_skip=0,
+          max_frames=4)
+    assert len(deadlines) == 4
+    assert all(abs(b-a-0.05) < 1e-6 for a, b in zip(deadlines, deadlines[1:]))
+
+
+def test_offscreen_asyncio():
+    """Events as an asynchronous iterator."""
+    g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen",
+                             events=[("key", "a"), None, ("click", (1, 2))])
+
+    async def main():
+        assert await g.next_event() == ("key", "a")
+        assert await g.next_event(timeout=0.1) is None
+        return [evt async for evt in g.events()]
+
+    assert asyncio.run(main()) == [("click", (1, 2)), ("END", None)]
+
+
+def test_offscreen_pool():
+    """Deleted pieces are hidden and reused by draw_piece."""
+    g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen", piece_pool=1)
+    first = g.draw_piece((0, 0), color="blue")
+    second = g.draw_piece((1, 1), color="blue")
+    g.rm(first)
+    g.rm(second)
+    # the pool is full: the second piece was really deleted
+    assert len(g.find_all()) == 2+1
+    assert g.pixel((5, 5)) != (0, 0, 255)
+    obj = g.draw_piece((2, 2), color="red")
+    assert obj == first
+    assert g.pixel((25, 25)) == (255, 0, 0)
+    assert g.stats()["pool"] == {"hits": 1, "misses": 2, "parked": 0}
+    # deleting a parked piece again does nothing
+    g.rm(obj)
+    g.rm(obj)
+    assert g.draw_piece((3, 3), color="red") == obj
+    assert obj in g.find_all()
+    assert g.pixel((35, 35)) == (255, 0, 0)
+    g.close()
+
+
+def test_offscreen_index():
+    """The pieces and tiles of each grid position are known."""
+    g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen")
+    tile = g.draw_tile((0, 0), "red")
+    first = g.draw_piece((1, 1))
+    second = g.draw_piece((2, 3))
+    assert g.tile_at((0, 0)) == tile and g.tile_at((1, 1)) is None
+    assert g.piece_at((1, 1)) == first and g.piece_at((0, 0)) is None
+    assert g.pieces_in((0, 0), (4, 4)) == [first, second]
+    assert g.pieces_in((2, 0), (9, 3)) == []
+    g.move_piece(first, (3, 0))
+    g.move_tile(tile, (3, 3))
+    assert g.piece_at((1, 1)) is None and g.piece_at((3, 0)) == first
+    assert g.tile_at((0, 0)) is None and g.tile_at((3, 3)) == tile
+    g.rm(second)
+    assert g.pieces_in((0, 0), (4, 4)) == [first]
+    # a piece covered by another one is found again when it leaves
+    top = g.draw_piece((3, 0))
+    assert g.piece_at((3, 0)) == top
+    g.rm(top)
+    assert g.piece_at((3, 0)) == first
+    top = g.draw_piece((3, 0))
+    g.move_piece(top, (0, 0))
+    assert g.piece_at((3, 0)) == first and g.piece_at((0, 0)) == top
+    # the same for the tiles
+    blue = g.draw_tile((3, 3), "blue")
+    g.rm(blue)
+    assert g.tile_at((3, 3)) == tile
+    g.erase()
+    assert g.piece_at((3, 0)) is None and g.tile_at((3, 3)) is None
+    g.close()
+
+
+def test_offscreen_refresh():
+    """The refreshes of the drawing functions are coalesced."""
+    for rate, updates in [(0, 64), (1, 1)]:
+        g = tkdraw.screen.Screen((8, 8), 10, grid=False, refresh_rate=rate,
+                                 backend="offscreen",
+                                 events=[None, ("key", "a")])
+        g.enable_stats()
+        for i in range(8):
+            for j in range(8):
+                g.draw_tile((i, j), "red")
+        assert g.stats()["updates"] == updates
+        # the last drawings are shown at the end of the period
+        g.root.tk.dooneevent(0)
+        assert g.stats()["updates"] == updates+(rate != 0)
+        assert g.pixel((75, 75)) == (255, 0, 0)
+        # or when waiting for an event
+        g.draw_tile((0, 0), "blue")
+        g.draw_tile((1, 1), "blue")
+        assert g.wait_event() == ("key", "a")
+        assert g.stats()["updates"] == updates+2
+        g.close()
+
+
+def test_offscreen_text():
+    """A text can be changed in place."""
+    g = tkdraw.screen.Screen((2, 8), 20, grid=False, backend="offscreen")
+    obj = g.draw_text((20, 80), "score: 0", color="blue")
+    g.update_text(obj, "score: 10")
+    assert g.itemcget(obj, "text") == "score: 10"
+    assert g.itemcget(obj, "fill") == "#0000ff"
+    g.update_text(obj, "game over", color="red")
+    assert g.itemcget(obj, "fill") == "#ff0000"
+    assert (255, 0, 0) in [g.pixel((20, x)) for x in range(160)]
+    g.close()
+
+
+def test_offscreen_grid():
+    """The grid lines are two objects, kept when erasing."""
+    g = tkdraw.screen.Screen((100, 100), 4, backend="offscreen")
+    lines = g.find_all()
+    assert len(lines) == 2
+    assert g.pixel((0, 0)) == g.pixel((400, 400)) == (0, 0, 0)
+    assert g.pixel((4, 2)) == g.pixel((2, 4)) == (0, 0, 0)
+    g.draw_piece((5, 5))
+    g.erase()
+    assert g.find_all() == lines
+    g.draw_grid([[1]*100]*100, grid=False)
+    assert len(g.find_all()) == 100*100
+    g.close()
+
+
+def test_offscreen_draw_grid():
+    """A second draw_grid only updates the pieces that changed."""
+    g = tkdraw.screen.Screen((3, 3), 10, backend="offscreen")
+    board = [[0, 1, None], [2, None, 0], [None, 1, 2]]
+    pieces = g.draw_grid(board)
+    before = {pos: g.piece_at(pos) for pos in
+              [(i, j) for i in range(3) for j in range(3)]}
+    assert len(pieces) == 6 and set(pieces) == set(before.values())-{None}
+    # recolor (0, 0), delete (0, 1) and add (1, 1)
+    board = [[1, None, None], [2, 3, 0], [None, 1, 2]]
+    pieces = g.draw_grid(board)
+    after = {pos: g.piece_at(pos) for pos in before}
+    assert len(pieces) == 6
+    assert after[(0, 0)] == before[(0, 0)]
+    assert (g.winfo_rgb(g.itemcget(after[(0, 0)], "fill"))
+            == g.winfo_rgb(g.DEFAULT_COLOR[1]))
+    assert after[(0, 1)] is None and before[(0, 1)] not in g.find_all()
+    assert before[(1, 1)] is None and after[(1, 1)] is not None
+    for pos in before:
+        if pos not in ((0, 0), (0, 1), (1, 1)):
+            assert after[pos] == before[pos]
+    g.close()
+
+
+def test_offscreen_view():
+    """A large board seen through a small scrolled window."""
+    # a view larger than the board: only the ValueError, close() is fine
+    unraisable = []
+    hook, sys.unraisablehook = sys.unraisablehook, unraisable.append
+    try:
+        tkdraw.screen.Screen((4, 4), 10, view=(5, 5), backend="offscreen")
+        assert False, "the view should be refused"
+    except ValueError:
+        pass
+    finally:
+        sys.unraisablehook = hook
+    assert unraisable == []
+    g = tkdraw.screen.Screen((1000, 1000), 10, view=(4, 5),
+                             backend="offscreen",
+                             events=[("click", (1, 2))])
+    objects = len(g.find_all())
+    tile = g.draw_tile((500, 500), "red")
+    piece = g.draw_piece((501, 502), color="blue")
+    assert tile < 0 and piece < 0
+    assert g.tile_at((500, 500)) == tile and g.piece_at((501, 502)) == piece
+    assert len(g.find_all()) == objects
+    assert g.pixel((5, 5)) != (255, 0, 0)
+    assert g.scroll_to((500, 500)) == (500, 500)
+    assert g.pixel((5, 5)) == (255, 0, 0)
+    assert g.pixel((15, 25)) == (0, 0, 255)
+    # clicks are given in board positions
+    assert g.wait_event() == ("click", (501, 502))
+    g.move_piece(piece, (500, 500))
+    assert g.pixel((15, 25)) != (0, 0, 255)
+    assert g.pixel((5, 5)) == (0, 0, 255)
+    assert g.scroll((1, 1)) == (501, 501)
+    assert g.pixel((5, 5)) != (0, 0, 255)
+    g.rm(piece)
+    assert g.piece_at((500, 500)) is None
+    # the view stays in the board
+    assert g.scroll_to((2000, -3)) == (996, 0)
+    assert len(g.find_all()) == objects
+    g.close()
+    # the memory only depends on the view and on what is drawn
+    g = tkdraw.screen.Screen((10**6, 10**6), 10, view=(4, 5),
+                             backend="offscreen")
+    tile = g.draw_tile((10**6-1, 10**6-1), "red")
+    assert g.tile_at((10**6-1, 10**6-1)) == tile
+    assert g.pieces_in((0, 0), (10, 10)) == []
+    g.close()
+
+
+def test_offscreen_motion():
+    """Test the mouse tracking and the motion events."""
+    g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen",
+                             events=[("motion", (0, 1)), ("key", "a"),
+                                     ("motion", (1, 1)), ("motion", (1, 2)),
+                                     ("motion", (2, 2)), None,
+                                     ("motion", (2, 2)), None,
+                                     ("key", "b")])
+    assert g.wait_event() == ("key", "a")
+    # the position is read without refreshing the window
+    assert g.mouse_position() == (6, 16)
+    g.enable_motion(rate=10)
+    assert g.wait_event() == ("motion", (1, 1))
+    # the next moves are coalesced, until the timer expires
+    assert g.wait_event() == ("motion", (2, 2))
+    assert g.mouse_position() == (26, 26)
+    # no event if the mouse stays on the same tile
+    assert g.wait_event() == ("key", "b")
+    g.close()
+
+
+def test_offscreen_events():
+    """Test poll_events() and the bounded event queue."""
+    g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen",
+                             events=[("key", "a")]*5
+                             + [("key", "b"), ("click", (1, 1)), None,
+                                ("key", "c"), ("key", "d"), ("key", "e"),
+                                ("END", None)])
+    g.limit_events(3, "coalesce")
+    assert g.poll_events() == [("key", "a"), ("key", "b"),
+                               ("click", (1, 1))]
+    assert g.stats()["events"] == {"queued": 0, "dropped": 0,
+                                   "coalesced": 4}
+    # nothing happened yet
+    assert g.poll_events() == []
+    assert g.wait_event(10) is None
+    g.limit_events(2)
+    # the window is closed, its last events are still available
+    assert g.poll_events(1) == [("key", "e")]
+    # END is never dropped
+    assert g.stats()["events"]["dropped"] == 2
+    assert g.poll_events() == [("END", None)]
+    try:
+        g.poll_events()
+        assert False, "the window should be closed"
+    except InterruptedError:
+        pass
+
+
+def test_offscreen_fb_draw():
+    """Lines, circles and rectangles are drawn in the image in pixel mode."""
+    g = tkdraw.screen.Screen((40, 60), 1, grid=False, backend="offscreen")
+    assert g.draw_line((5, 5), (5, 20), "red") is None
+    assert g.draw_rectangle((10, 30), (20, 50), "blue", refresh=False) is None
+    assert g.draw_circle((20, 0), (40, 20), "green", border=0) is None
+    assert g.draw_lines([(0, 0), (39, 0)], [(0, 59), (39, 59)],
+                        "yellow") is None
+    # a single object: the image
+    assert len(g.find_all()) == 1
+    assert g.pixel((5, 5)) == g.pixel((5, 19)) == (255, 0, 0)
+    assert g.pixel((5, 20)) != (255, 0, 0)
+    assert g.pixel((10, 30)) == g.pixel((19, 49)) == (0, 0, 255)
+    assert g.pixel((20, 50)) != (0, 0, 255)
+    assert g.pixel((30, 10)) == (0, 255, 0)
+    assert g.pixel((21, 1)) != (0, 255, 0)
+    assert g.pixel((0, 30)) == g.pixel((39, 58)) == (255, 255, 0)
+    g.close()
+
+    # the same objects in a vector window
+    g = tkdraw.screen.Screen((40, 60), 1, grid=False, framebuffer=False,
+                             backend="offscreen")
+    assert len(g.draw_lines([(0, 0), (39, 0)], [(0, 59), (39, 59)])) == 2
+    assert g.draw_rectangle((10, 30), (20, 50), "blue") is not None
+    assert g.pixel((10, 30)) == g.pixel((19, 49)) == (0, 0, 255)
+    assert len(g.find_all()) == 3
+    g.close()
+
+
+def test_offscreen_layers():
+    """Test the layers: z-order, visibility, moves and deletions."""
+    g = tkdraw.screen.Screen((4, 4), 10, piece_pool=4, backend="offscreen")
+    blue, red = (0, 0, 255), (255, 0, 0)
+    g.draw_tile((0, 0), "red", layer="board")
+    piece = g.draw_piece((0, 0), color="blue", layer="pieces")
+    assert g.pixel((5, 5)) == blue
+    g.raise_layer("board")
+    assert g.pixel((5, 5)) == red
+    # a new object goes on top of its own layer
+    other = g.draw_piece((1, 1), color="blue", layer="pieces")
+    g.draw_piece((0, 0), color="blue", layer="pieces")
+    assert g.pixel((5, 5)) == red
+    g.lower_layer("board")
+    assert g.pixel((5, 5)) == blue
+    g.hide_layer("pieces")
+    assert g.pixel((5, 5)) == red
+    assert g.pixel((15, 15)) != blue
+    # hidden, as its layer, without hiding the whole layer again
+    configured = []
+    itemconfig = g.itemconfig
+    g.itemconfig = lambda tag, **kw: (configured.append(tag)
+                                      or itemconfig(tag, **kw))
+    g.draw_piece((1, 1), color="green", layer="pieces")
+    assert g.pixel((15, 15)) != (0, 255, 0)
+    assert "tkdraw_layer_pieces" not in configured
+    del g.itemconfig
+    g.show_layer("pieces")
+    assert g.pixel((15, 15)) == (0, 255, 0)
+    g.move_layer("pieces", (20, 0))
+    assert g.pixel((35, 15)) == (0, 255, 0)
+    # a deleted piece of the pool leaves its layer
+    g.rm(other)
+    g.show_layer("pieces")
+    assert "tkdraw_layer_pieces" not in g.itemcget(other, "tags")
+    g.clear_layer("board")
+    assert g.tile_at((0, 0)) is None
+    g.clear_layer("pieces")
+    assert g.piece_at((0, 0)) is None and piece not in g.find_all()
+    # grid lines and the parked piece
+    assert len(g.find_all()) == 3
+    g.close()
+
+
+def test_offscreen_layers_deleted():
+    """A layer whose objects were all deleted can be drawn in again."""
+    g = tkdraw.screen.Screen((4, 4), 10, tile_cache=True,
+                             backend="offscreen")
+    g.draw_tile((0, 0), "red", layer="a")
+    # the tile of the layer is deleted by the tile cache
+    g.move_tile(g.draw_tile((1, 1), "blue"), (0, 0))
+    g.hide_layer("a")
+    tile = g.draw_tile((2, 2), "red", layer="a")
+    assert g.pixel((25, 25)) != (255, 0, 0)
+    g.show_layer("a")
+    assert g.pixel((25, 25)) == (255, 0, 0)
+    # deleted behind the back of the layer
+    g.delete(tile)
+    g.draw_tile((3, 3), "red", layer="a")
+    assert g.pixel((35, 35)) == (255, 0, 0)
+    g.close()
+
+
+def test_offscreen_threadsafe():
+    """Draw from another thread through the proxy, then close the window."""
+    g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen")
+    proxy = g.threadsafe()
+    futures = []
+
+    def worker():
+        piece = proxy.draw_piece((1, 1), color="blue")
+        # the futures can be given as positional or keyword arguments
+        futures.append(proxy.move_piece(piece, (2, 2)))
+        futures.append(proxy.rm(obj=piece))
+        futures.append(proxy.draw_tile((3, 3), color="nocolor"))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert not any(f.done() for f in futures)
+    g.refresh()
+    assert futures[0].result() is None and futures[1].result() is None
+    assert g.pixel((25, 25)) != (0, 0, 255)
+    # the exception is given to the calling thread
+    try:
+        futures[2].result()
+        assert False, "the color should be unknown"
+    except tkinter.TclError:
+        pass
+
+    # queued before close(): never done
+    thread = threading.Thread(target=lambda: futures.append(
+        proxy.draw_tile((0, 0), "red")))
+    thread.start()
+    thread.join()
+    g.close()
+    # sent after close()
+    thread = threading.Thread(target=lambda: futures.append(
+        proxy.draw_tile((0, 0), "red")))
+    thread.start()
+    thread.join()
+    assert len(futures) == 5
+    for future in futures[3:]:
+        try:
+            future.result()
+            assert False, "the window is closed"
+        except InterruptedError:
+            pass
+
+
+def test_offscreen_threadsafe_pixels():
+    """The pixels drawn by other threads are shown while waiting."""
+    g = tkdraw.screen.Screen((4, 4), 1, grid=False, backend="offscreen",
+                             events=[None])
+    proxy = g.threadsafe()
+    thread = threading.Thread(target=lambda: proxy.draw_tile((2, 2), "red"))
+    thread.start()
+    thread.join()
+    assert g.wait_event(100) is None
+    # pylint: disable=protected-access
+    # nothing is left to send to the image.
+    assert not g._fb_dirty
+    assert g.pixel((2, 2)) == (255, 0, 0)
+    g.close()
+
+
+def test_offscreen_signals():
+    """A Ctrl-C wakes a blocked tk event loop up (headless Tcl)."""
+    g = tkdraw.screen.Screen((2, 2), 10, backend="offscreen")
+    interp = tkinter.Tcl()
+    # pylint: disable=protected-access
+    # the signals are caught by a real tk event loop, without a display.
+    g.root.tk = interp.tk
+    tkdraw.screen.Screen._catch_signals(g)
+    assert g._sigpipe and signal.getsignal(signal.SIGINT) == g._on_signal
+    threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGINT)).start()
+    # don't block forever if the signal doesn't wake tk up
+    interp.tk.call("after", 5000, "set timeout 1")
+    start = time.perf_counter()
+    g._waiting = True
+    try:
+        interp.tk.dooneevent(0)
+        g._deliver_signals()
+        assert False, "the signal should interrupt the wait"
+    except KeyboardInterrupt:
+        assert time.perf_counter()-start < 2
+    # out of wait_event(), a Ctrl-C is not delayed
+    g._waiting = False
+    try:
+        os.kill(os.getpid(), signal.SIGINT)
+        time.sleep(1)
+        assert False, "the signal should interrupt the program"
+    except KeyboardInterrupt:
+        pass
+    # restored by close()
+    tkdraw.screen.Screen._release_signals(g)
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+    assert signal.set_wakeup_fd(-1) == -1
+    g.root.tk = g.root
+    g.close()
+
+
+def test_offscreen_wakeup():
+    """Without a wakeup pipe, wait_event() wakes up to handle the signals."""
+    class Window(tkdraw.offscreen.OffscreenScreen):
+        """An offscreen window waking up as a tk one."""
+        _WAKEUP = 100
+
+    g = Window((2, 2), 10, events=[None, None, ("key", "a")])
+    # the two None events let the time pass: two wakeups, and no event
+    assert g.wait_event() == ("key", "a")
+    assert g.root.clock == 200
+    # the wakeups stop with wait_event()
+    # pylint: disable=protected-access
+    # checks the timers of the simulated tk.
+    assert all(timer[2] in g.root._cancelled for timer in g.root._timers)
+    g.close()
+
+    # the wakeup fd is already used: SIGINT is still caught while waiting
+    g = tkdraw.screen.Screen((2, 2), 10, backend="offscreen")
+    g.root.tk = tkinter.Tcl().tk
+    other = os.pipe()
+    os.set_blocking(other[1], False)
+    signal.set_wakeup_fd(other[1])
+    tkdraw.screen.Screen._catch_signals(g)
+    assert not g._sigpipe and signal.set_wakeup_fd(other[1]) == other[1]
+    g._waiting = True
+    os.kill(os.getpid(), signal.SIGINT)
+    time.sleep(0.1)
+    g._waiting = False
+    try:
+        g._deliver_signals()
+        assert False, "the signal should be delivered"
+    except KeyboardInterrupt:
+        pass
+    tkdraw.screen.Screen._release_signals(g)
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+    signal.set_wakeup_fd(-1)
+    for fileno in other:
+        os.close(fileno)
+    g.root.tk = g.root
+    g.close()
+
+
+def test_offscreen_tile_cache():
+    """Test draw_tile with the tile cache: one object per position."""
+    g = tkdraw.screen.Screen((3, 3), 10, tile_cache=True, backend="offscreen")
+    objects = len(g.find_all())
+    tile = g.draw_tile((1, 1), "red")
+    # recoloring reuses the cached tile, whatever the number of drawings
+    for color in ("blue", "green", "red")*10:
+        assert g.draw_tile((1, 1), color) == tile
+    assert len(g.find_all()) == objects+1
+    assert g.pixel((15, 15)) == (255, 0, 0)
+    assert g.tile_at((1, 1)) == tile
+    # moving a tile on a cached one deletes it
+    other = g.draw_tile((2, 2), "blue")
+    g.move_tile(other, (1, 1))
+    assert tile not in g.find_all() and g.tile_at((1, 1)) == other
+    assert g.tile_at((2, 2)) is None
+    assert g.draw_tile((1, 1), "green") == other
+    assert len(g.find_all()) == objects+1
+    g.close()
+
+
+def test_offscreen_blit():
+    """Test blit: palette, transparent cells, clipping and tile cache."""
+    red, green, blue = (255, 0, 0), (0, 255, 0), (0, 0, 255)
+    for framebuffer in (True, False):
+        g = tkdraw.screen.Screen((4, 4), 10, framebuffer=framebuffer,
+                                 tile_cache=True, backend="offscreen")
+        palette = ["red", "green", "blue"]
+        g.blit([[0, 1], [2, 0]], palette, origin=(1, 1))
+        assert g.pixel((15, 15)) == g.pixel((25, 25)) == red
+        assert g.pixel((15, 25)) == green and g.pixel((25, 15)) == blue
+        # None leaves the tiles as they are
+        g.blit([[None, 2], [None, None]], palette, origin=(1, 1))
+        g.blit([[None]], origin=(0, 0))
+        assert g.pixel((15, 15)) == red and g.pixel((15, 25)) == blue
+        assert g.pixel((5, 5)) != (0, 0, 0)
+        # the tiles outside the window are ignored
+        g.blit([[1, 1, 1]]*3, palette, origin=(-1, -2))
+        assert g.pixel((5, 5)) == green and g.pixel((15, 5)) == green
+        assert g.pixel((15, 15)) == red
+        g.blit([[2]*3]*3, palette, origin=(3, 3))
+        assert g.pixel((35, 35)) == blue
+        assert g.blit([[2]], palette, origin=(4, 0)) == []
+        assert g.blit([[2]], palette, origin=(-1, 0)) == []
+        if not framebuffer:
+            # the cached tiles are reused
+            objects = len(g.find_all())
+            tiles = g.blit([[0, 1], [2, 0]], palette, origin=(1, 1))
+            assert g.blit([[1, 2], [0, 1]], palette, origin=(1, 1)) == tiles
+            assert len(g.find_all()) == objects
+            assert g.pixel((15, 15)) == green
+        g.close()
@@ -0,0 +1,65 @@
+"""Test the tkdraw.record module (offscreen, no display needed)."""
+import os
+import tempfile
+import threading
+
+import tkdraw.record
+import tkdraw.screen
+
+
+def test_record():
+    """Record some drawings and events, and replay them."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "test.log")
+        g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen",
+                                 events=[("click", (1, 2))])
+        g.start_recording(path)
+        blue = g.color("blue")
+        obj = g.draw_piece((0, 0), color=blue)
+        g.draw_grid([[None, 2, None, None]]*4)
+        g.draw_tile((3, 3), "red", refresh=False)
+        assert g.wait_event() == ("click", (1, 2))
+        g.move_piece(obj, (2, 0))
+        g.rm(g.draw_text((5, 5), "x"))
+        image = g.image().copy()
+        g.close()
+
+        records = list(tkdraw.record.read(path))
+        assert [r[1] for r in records] == [
+            "__init__", "color", "draw_piece", "draw_grid", "draw_tile",
+            "wait_event", "move_piece", "draw_text", "rm"]
+        assert records[5][4] == ("click", (1, 2))
+
+        g = tkdraw.record.replay(path, backend="offscreen")
+        assert g.image().data == image.data
+        g.close()
+
+
+def test_record_threadsafe():
+    """Record the commands of other threads, and read a truncated log."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "test.log")
+        g = tkdraw.screen.Screen((4, 4), 10, backend="offscreen")
+        g.start_recording(path)
+        proxy = g.threadsafe()
+        thread = threading.Thread(
+            target=lambda: proxy.draw_tile((1, 1), "red"))
+        thread.start()
+        thread.join()
+        g.refresh()
+        image = g.image().copy()
+        # each record is written at once, before close()
+        assert [r[1] for r in tkdraw.record.read(path)] == [
+            "__init__", "draw_tile", "refresh"]
+
+        g2 = tkdraw.record.replay(path, backend="offscreen")
+        assert g2.image().data == image.data
+        g2.close()
+
+        # the program crashed while writing a record
+        g.draw_tile((2, 2), "blue")
+        g.close()
+        with open(path, "r+b") as log:
+            log.truncate(os.path.getsize(path)-1)
+        assert [r[1] for r in tkdraw.record.read(path)] == [
+            "__init__", "draw_tile", "refresh"]